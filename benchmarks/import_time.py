@@ -0,0 +1,95 @@
+"""
+Cold-start budget check: measures `import app.main` for each service with
+`python -X importtime` in a fresh interpreter and fails if it is over budget.
+
+    python benchmarks/import_time.py [--runs 5] [--output import_time.json]
+
+Budgets (ms, median of --runs) default to BUDGET_MS and can be overridden
+with IMPORT_BUDGET_<SERVICE>_MS. Importing must not touch the network: dummy
+connection settings are used, so any eager connection shows up as a failure
+or a blown budget. The heaviest modules are listed to show where time goes.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = ["problem", "user"]
+# About a quarter above the measured medians (~750ms problem, ~820ms user):
+# enough for run-to-run noise, tight enough to catch one heavy eager import
+BUDGET_MS = {"problem": 950, "user": 1050}
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def service_env() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DB_USER": "bench", "PASSWORD": "bench", "DB_HOST": "127.0.0.1", "DB_PORT": "1", "DB_NAME": "bench",
+        "REDIS_HOST": "127.0.0.1", "REDIS_PORT": "1", "REDIS_PASSWORD": "", "JWT_SECRET": "import-time",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+def measure(service: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """(total ms, [(module, self ms, cumulative ms)]) for one fresh import of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=os.path.join(ROOT, service), env=service_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {service} app.main failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules.append((name, self_us / 1000, cumulative_us / 1000))
+        if len(indent) == 1:  # top-level imports: their cumulative times add up to the total
+            total_us += cumulative_us
+    return total_us / 1000, modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results: Dict[str, dict] = {}
+    over_budget = []
+    for service in SERVICES:
+        budget = float(os.getenv(f"IMPORT_BUDGET_{service.upper()}_MS", BUDGET_MS[service]))
+        totals, modules = [], []
+        for _ in range(args.runs):
+            total, modules = measure(service)
+            totals.append(total)
+        median = statistics.median(totals)
+        heaviest = sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]
+
+        status = "OK" if median <= budget else "OVER BUDGET"
+        print(f"{service:<8} import app.main  median {median:7.1f}ms  (budget {budget:.0f}ms)  {status}")
+        for name, self_ms, cumulative_ms in heaviest:
+            print(f"    {self_ms:7.1f}ms self  {cumulative_ms:7.1f}ms cumulative  {name}")
+        if median > budget:
+            over_budget.append(service)
+        results[service] = {
+            "median_ms": round(median, 1),
+            "runs_ms": [round(t, 1) for t in totals],
+            "budget_ms": budget,
+            "heaviest": [{"module": n, "self_ms": round(s, 1), "cumulative_ms": round(c, 1)} for n, s, c in heaviest],
+        }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
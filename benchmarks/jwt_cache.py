@@ -0,0 +1,45 @@
+"""
+Compares a full python-jose verification against a ClaimsCache hit.
+
+    python benchmarks/jwt_cache.py [problem|user] [iterations]
+"""
+import os
+import sys
+import time
+import timeit
+
+SERVICE = sys.argv[1] if len(sys.argv) > 1 else "problem"
+ITERATIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), SERVICE))
+
+from jose import jwt  # noqa: E402
+from app.core import security  # noqa: E402
+
+token = jwt.encode(
+    {"sub": "42", "username": "bench", "exp": int(time.time()) + 3600},
+    security.SECRET_KEY,
+    algorithm=security.ALGORITHM
+)
+
+def full_decode():
+    jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+
+def cache_miss():
+    security.ClaimsCache.clear()
+    security.decode_token(token)
+
+def cache_hit():
+    security.decode_token(token)
+
+def malformed():
+    security.decode_token("not-a-jwt")
+
+if __name__ == "__main__":
+    security.decode_token(token)
+    print(f"{SERVICE}: {ITERATIONS} iterations")
+    for name, fn in [("jwt.decode", full_decode), ("decode_token miss", cache_miss),
+                     ("decode_token hit", cache_hit), ("malformed reject", malformed)]:
+        seconds = timeit.timeit(fn, number=ITERATIONS)
+        print(f"  {name:<20} {seconds / ITERATIONS * 1e6:8.2f} us/op")
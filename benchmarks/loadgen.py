@@ -0,0 +1,269 @@
+"""
+Closed-loop load generator for the problem and user services.
+
+    python benchmarks/loadgen.py --problem-url http://127.0.0.1:8082 --user-url http://127.0.0.1:8083 \
+        [--scenarios search,problem,submit,login,chat] [--concurrency 32] [--duration 30] \
+        [--output results.json] [--compare baseline.json]
+
+Each scenario runs on its own for --duration seconds with --concurrency
+workers. Results (throughput, p50/p95/p99 latency, error counts) are written
+as JSON tagged with the current git commit, so runs can be diffed across
+commits with --compare. Cache hit rates per tier (and per search cache) are
+taken from the problem service's /metrics before and after each scenario.
+Search queries vary in case, spacing and tag order the way real input does.
+
+The submit scenario acts as the judge too: after JUDGE_LATENCY_MS it posts a
+verdict to the batched ingest endpoint, then measures submit-to-verdict time
+through the long-poll endpoint.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from typing import Callable, Dict, List
+import httpx
+from jose import jwt
+
+JWT_SECRET = os.getenv("JWT_SECRET", "benchmark-secret")
+JUDGE_TOKEN = os.getenv("JUDGE_INGEST_TOKEN", "benchmark-judge")
+JUDGE_LATENCY_MS = int(os.getenv("JUDGE_LATENCY_MS", 300))
+SEARCH_TERMS = ["two sum", "graph", "binary search", "knapsack", "segment tree", "substring", "intervals", None]
+TAGS = ["array", "dp", "graph", "math", "string", "greedy", "tree"]
+DIFFICULTIES = ["Easy", "Medium", "Hard", None]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def typed_like_a_user(term: str, rng: random.Random) -> str:
+    """Real traffic: the same query arrives capitalized, padded or double-spaced."""
+    variant = rng.random()
+    if variant < 0.5:
+        return term
+    if variant < 0.7:
+        return term.title()
+    if variant < 0.85:
+        return f"{term} "
+    return term.replace(" ", "  ")
+
+def cache_counters(problem_url: str) -> Dict[str, float]:
+    """cache_lookups_total and search_cache_lookups_total samples from /metrics (empty if unavailable)."""
+    try:
+        text = httpx.get(f"{problem_url}/metrics", timeout=5).text
+    except httpx.HTTPError:
+        return {}
+    counters = {}
+    for line in text.splitlines():
+        if line.startswith(("cache_lookups_total{", "search_cache_lookups_total{")):
+            name, value = line.rsplit(" ", 1)
+            counters[name] = float(value)
+    return counters
+
+def hit_rates(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, float]:
+    """Hit rate per cache tier / search kind over the interval between two scrapes."""
+    hits: Dict[str, float] = {}
+    totals: Dict[str, float] = {}
+    for name, value in after.items():
+        delta = value - before.get(name, 0.0)
+        labels = dict(part.split("=", 1) for part in name[name.index("{") + 1:-1].split(","))
+        labels = {k: v.strip('"') for k, v in labels.items()}
+        if name.startswith("search_"):
+            group, hit = f"search_{labels['kind']}", labels["result"] != "miss"
+        else:
+            group, hit = labels["tier"], labels["result"] == "hit"
+        totals[group] = totals.get(group, 0.0) + delta
+        if hit:
+            hits[group] = hits.get(group, 0.0) + delta
+    return {group: round(hits.get(group, 0.0) / total, 4) for group, total in totals.items() if total}
+
+def token_for(user_id: int) -> str:
+    return jwt.encode(
+        {"sub": str(user_id), "username": f"user{user_id}", "exp": int(time.time()) + 3600},
+        JWT_SECRET, algorithm="HS256"
+    )
+
+
+class Scenarios:
+    def __init__(self, args):
+        self.args = args
+        self.problem_url = args.problem_url.rstrip("/")
+        self.user_url = args.user_url.rstrip("/")
+        self.tokens = {uid: token_for(uid) for uid in range(1, args.users + 1)}
+
+    def _auth(self, rng: random.Random) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[rng.randint(1, self.args.users)]}"}
+
+    async def search(self, client: httpx.AsyncClient, rng: random.Random):
+        params = {"page": rng.choice([0, 0, 0, 1, 2]), "size": 10}
+        term, difficulty = rng.choice(SEARCH_TERMS), rng.choice(DIFFICULTIES)
+        if term:
+            params["search"] = typed_like_a_user(term, rng)
+        if difficulty:
+            params["difficulty"] = difficulty if rng.random() < 0.7 else difficulty.lower()
+        if rng.random() < 0.3:
+            # Same tag set, in whatever order the UI happened to send it
+            params["tags"] = rng.sample(TAGS, rng.choice([1, 1, 2]))
+        return await client.get(f"{self.problem_url}/api/v1/problem/search", params=params)
+
+    async def problem(self, client: httpx.AsyncClient, rng: random.Random):
+        # Zipf-ish: a few hot problems, long tail
+        problem_id = min(self.args.problems, int(rng.paretovariate(1.2)))
+        return await client.get(f"{self.problem_url}/api/v1/problem/problem/{problem_id}")
+
+    async def submit(self, client: httpx.AsyncClient, rng: random.Random):
+        body = {
+            "problemId": rng.randint(1, self.args.problems),
+            "code": f"int main() {{ return {rng.getrandbits(48)}; }}",
+            "language": rng.choice(["cpp", "python", "java"])
+        }
+        response = await client.post(f"{self.problem_url}/api/v1/problem/submit", json=body, headers=self._auth(rng))
+        if response.status_code != 200:
+            return response
+        sub_id = response.json()["submissionId"]
+
+        async def judge():
+            await asyncio.sleep(JUDGE_LATENCY_MS / 1000)
+            passed = rng.random() < 0.4
+            await client.post(
+                f"{self.problem_url}/api/v1/problem/submissions/results",
+                json=[{
+                    "submissionId": sub_id, "status": "PASSED" if passed else "FAILED",
+                    "result": "Accepted" if passed else "Wrong Answer",
+                    "totalTests": 5, "passedTests": 5 if passed else 2, "timeTakenMs": 42, "memoryUsed": "12MB"
+                }],
+                headers={"X-Judge-Token": JUDGE_TOKEN}
+            )
+
+        judge_task = asyncio.create_task(judge())
+        poll = await client.get(f"{self.problem_url}/api/v1/problem/submissions/{sub_id}")
+        await judge_task
+        return poll
+
+    async def login(self, client: httpx.AsyncClient, rng: random.Random):
+        uid = rng.randint(1, self.args.users)
+        return await client.post(
+            f"{self.user_url}/api/v1/user/login",
+            json={"email": f"user{uid}@bench.local", "password": "password"}
+        )
+
+    async def chat(self, client: httpx.AsyncClient, rng: random.Random):
+        body = {
+            "problemStatement": "Given an array, find two numbers that sum to the target.",
+            "code": "",
+            "userMessage": rng.choice(["How should I approach this?", "Give me a hint", "What is the time complexity?"]),
+            "problemId": str(rng.randint(1, 50))
+        }
+        return await client.post(f"{self.user_url}/api/v1/user/chat", json=body, headers=self._auth(rng))
+
+
+async def run_scenario(name: str, fn: Callable, concurrency: int, duration: float, seed: int) -> Dict:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker(worker_id: int):
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await fn(client, rng)
+                    status = str(response.status_code)
+                except Exception as e:
+                    status = type(e).__name__
+                elapsed = (time.perf_counter() - start) * 1000
+                if status == "200":
+                    latencies.append(elapsed)
+                else:
+                    errors[status] = errors.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+    print(f"  {name:<8} {result['throughput_rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.1f}ms  "
+          f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  errors {sum(errors.values())}")
+    return result
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+def compare(current: Dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline.get('commit')} ({baseline_path})")
+    for name, result in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        deltas = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if old[metric]:
+                deltas.append(f"{metric} {100 * (result[metric] - old[metric]) / old[metric]:+.1f}%")
+        for group, rate in result.get("cache_hit_rate", {}).items():
+            if group in old.get("cache_hit_rate", {}):
+                deltas.append(f"{group} hit {100 * (rate - old['cache_hit_rate'][group]):+.1f}pp")
+        print(f"  {name:<8} " + "  ".join(deltas))
+
+async def main(args):
+    scenarios = Scenarios(args)
+    results = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "config": {"concurrency": args.concurrency, "duration": args.duration, "seed": args.seed},
+        "scenarios": {}
+    }
+    print(f"commit {results['commit']}  concurrency {args.concurrency}  duration {args.duration}s")
+    for name in args.scenarios.split(","):
+        before = cache_counters(scenarios.problem_url)
+        results["scenarios"][name] = await run_scenario(
+            name, getattr(scenarios, name), args.concurrency, args.duration, args.seed
+        )
+        rates = hit_rates(before, cache_counters(scenarios.problem_url))
+        if rates:
+            results["scenarios"][name]["cache_hit_rate"] = rates
+            print("           cache hit rate  " + "  ".join(f"{g} {100 * r:.1f}%" for g, r in sorted(rates.items())))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--problem-url", default="http://127.0.0.1:8082")
+    parser.add_argument("--user-url", default="http://127.0.0.1:8083")
+    parser.add_argument("--scenarios", default="search,problem,submit,login,chat")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--problems", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    return parser
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
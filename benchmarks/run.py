@@ -0,0 +1,135 @@
+"""
+One-command benchmark: boots the stub AI server and both services against a
+local Postgres + Redis, optionally seeds, runs loadgen and writes the results.
+
+    pip install -r benchmarks/requirements.txt -r problem/requirements.txt -r user/requirements.txt
+    docker run -d -p 5432:5432 -e POSTGRES_USER=bench -e POSTGRES_PASSWORD=bench -e POSTGRES_DB=codear postgres:16
+    docker run -d -p 6379:6379 redis:7
+    python benchmarks/run.py --seed-data --output benchmarks/results/$(git rev-parse --short HEAD).json \
+        [--compare benchmarks/results/<previous>.json] [loadgen options...]
+
+Connection settings come from BENCH_DB_* / BENCH_REDIS_* (defaults match the
+containers above). Every run starts cold: after seeding, the bench Redis is
+flushed and the snapshot directory cleared, then the services boot and warm
+up against the seeded data. Rate limits are raised so the limiter does not
+cap the measured throughput; submit verdicts are posted by loadgen acting as
+the judge.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import redis
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, "benchmarks")
+sys.path.insert(0, BENCH_DIR)
+
+import loadgen  # noqa: E402
+
+STUB_AI_PORT = 9100
+
+def service_env() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DB_USER": os.getenv("BENCH_DB_USER", "bench"),
+        "PASSWORD": os.getenv("BENCH_DB_PASSWORD", "bench"),
+        "DB_HOST": os.getenv("BENCH_DB_HOST", "127.0.0.1"),
+        "DB_PORT": os.getenv("BENCH_DB_PORT", "5432"),
+        "DB_NAME": os.getenv("BENCH_DB_NAME", "codear"),
+        "DB_SSLMODE": "disable",
+        "REDIS_HOST": os.getenv("BENCH_REDIS_HOST", "127.0.0.1"),
+        "REDIS_PORT": os.getenv("BENCH_REDIS_PORT", "6379"),
+        "REDIS_PASSWORD": os.getenv("BENCH_REDIS_PASSWORD", ""),
+        "REDIS_SSL": "false",
+        "SHARED_L1_DIR": os.path.join(tempfile.gettempdir(), "codear-bench-l1"),
+        "SQS_BACKEND": "local",
+        "JWT_SECRET": loadgen.JWT_SECRET,
+        "JUDGE_INGEST_TOKEN": loadgen.JUDGE_TOKEN,
+        "AI_API_URL": f"http://127.0.0.1:{STUB_AI_PORT}/v1/chat/completions",
+        "OPEN_AI_KEY": "stub",
+        "RATE_LIMIT_SUBMIT": "1000000/1",
+        "RATE_LIMIT_SUBMIT_GLOBAL": "1000000/1",
+        "RATE_LIMIT_TEST": "1000000/1",
+        "RATE_LIMIT_TEST_GLOBAL": "1000000/1",
+        "RATE_LIMIT_CHAT": "1000000/1",
+        "RATE_LIMIT_CHAT_GLOBAL": "1000000/1",
+    })
+    return env
+
+def dsn(env: dict) -> str:
+    return (f"postgresql://{env['DB_USER']}:{env['PASSWORD']}@{env['DB_HOST']}:{env['DB_PORT']}/{env['DB_NAME']}")
+
+def reset_caches(env: dict):
+    """Empties the bench Redis and the host snapshots left by a previous run."""
+    client = redis.Redis(host=env["REDIS_HOST"], port=int(env["REDIS_PORT"]), password=env["REDIS_PASSWORD"] or None)
+    client.flushdb()
+    client.close()
+    shutil.rmtree(env["SHARED_L1_DIR"], ignore_errors=True)
+
+def start(cmd, cwd: str, env: dict, log_name: str) -> subprocess.Popen:
+    log = open(os.path.join(BENCH_DIR, f"{log_name}.log"), "w")
+    return subprocess.Popen(cmd, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def wait_healthy(url: str, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become healthy within {timeout}s (see benchmarks/*.log)")
+
+def main():
+    parser = loadgen.build_parser()
+    parser.add_argument("--seed-data", action="store_true", help="truncate and seed the database first")
+    parser.add_argument("--submissions", type=int, default=2000000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers per service")
+    args = parser.parse_args()
+
+    env = service_env()
+    problem_port = args.problem_url.rsplit(":", 1)[-1]
+    user_port = args.user_url.rsplit(":", 1)[-1]
+    uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--workers", str(args.workers),
+               "--log-level", "warning"]
+
+    # Services no longer create tables on startup
+    for service in ("problem", "user"):
+        subprocess.run([sys.executable, "-m", "app.migrate"], cwd=os.path.join(ROOT, service), env=env, check=True)
+    # Seed before the services start: their startup warm-up must see the data
+    if args.seed_data:
+        import seed
+        seed.seed(dsn(env), args.problems, args.submissions, args.users, 10000)
+    reset_caches(env)
+
+    processes = [
+        start([sys.executable, "stub_ai_server.py", str(STUB_AI_PORT)], BENCH_DIR, env, "stub_ai"),
+        start(uvicorn + ["app.main:app", "--port", problem_port], os.path.join(ROOT, "problem"), env, "problem"),
+        start(uvicorn + ["app.main:app", "--port", user_port], os.path.join(ROOT, "user"), env, "user"),
+    ]
+    try:
+        # /ready, not the health check: measure after the startup warm-up
+        wait_healthy(f"{args.problem_url}/api/v1/problem/ready")
+        wait_healthy(f"{args.user_url}/api/v1/user/health")
+
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        asyncio.run(loadgen.main(args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
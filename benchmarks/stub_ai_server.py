@@ -0,0 +1,45 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+    python benchmarks/stub_ai_server.py [port]
+    AI_API_URL=http://127.0.0.1:9100/v1/chat/completions  (user service)
+
+Replies with a fixed answer after STUB_AI_LATENCY_MS, streamed word by word
+when the request sets "stream": true.
+"""
+import asyncio
+import json
+import os
+import sys
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LATENCY_MS = int(os.getenv("STUB_AI_LATENCY_MS", 200))
+TOKEN_DELAY_MS = int(os.getenv("STUB_AI_TOKEN_DELAY_MS", 10))
+REPLY = os.getenv(
+    "STUB_AI_REPLY",
+    "Try sorting the array first, then use two pointers moving towards each other."
+)
+
+app = FastAPI(title="Stub AI")
+
+@app.post("/v1/chat/completions")
+async def completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    if not body.get("stream"):
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}}]}
+
+    async def events():
+        for i, word in enumerate(REPLY.split(" ")):
+            delta = word if i == 0 else f" {word}"
+            yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': delta}}]})}\n\n"
+            await asyncio.sleep(TOKEN_DELAY_MS / 1000)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]) if len(sys.argv) > 1 else 9100)
@@ -0,0 +1,36 @@
+import hmac
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.contest_schema import ContestDTO, ContestStatusDTO
+from app.services.contest_service import ContestService
+from typing import Optional
+
+router = APIRouter(prefix="/api/v1/problem")
+
+def require_contest_admin(x_admin_token: str = Header(None)):
+    """Shared-secret check for contest changes, like X-Judge-Token on /submissions/results."""
+    expected = os.getenv("CONTEST_ADMIN_TOKEN")
+    if not expected or not x_admin_token or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+@router.get("/contest", response_model=Optional[ContestStatusDTO])
+def get_contest():
+    return ContestService.status()
+
+@router.put("/contest", response_model=ContestStatusDTO, dependencies=[Depends(require_contest_admin)])
+def start_contest(dto: ContestDTO, db: Session = Depends(get_db)):
+    if not dto.problemIds:
+        raise HTTPException(status_code=400, detail="problemIds must not be empty")
+    try:
+        return ContestService.activate(
+            db, dto.contestId, dto.problemIds, dto.endsAt.timestamp() if dto.endsAt else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/contest", dependencies=[Depends(require_contest_admin)])
+def end_contest():
+    ContestService.deactivate()
+    return {"message": "Contest mode ended"}
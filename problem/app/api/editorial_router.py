@@ -1,26 +1,25 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services.editorial_service import EditorialService
-from app.schemas.editorial_schema import EditorialCreateDTO, EditorialDTO
+from app.services.contest_service import ContestService
+from app.schemas.editorial_schema import EditorialCreateDTO, EditorialDTO, EditorialSummaryDTO, EditorialVoteDTO
 from app.core import security
 from typing import List
 
 router = APIRouter(prefix="/api/v1/problem")
 
+def editorials_open(problemId: int):
+    if ContestService.editorials_locked(problemId):
+        raise HTTPException(status_code=403, detail="Editorials are locked while this problem is in a running contest")
+
 @router.post("/{problemId}/editorial", response_model=EditorialDTO)
 def create_editorial(
     problemId: int,
     dto: EditorialCreateDTO,
-    authorization: str = Header(...),
+    user_context: dict = Depends(security.get_current_user),
     db: Session = Depends(get_db)
 ):
-    token = authorization.split(" ")[1]
-    user_context = security.extract_user_context(token)
-    
-    if not user_context:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-        
     # Ensure URL problemId matches body problemId
     dto.problemId = problemId
         
@@ -31,7 +30,44 @@ def create_editorial(
         username=user_context["username"]
     )
 
-@router.get("/{problemId}/editorial", response_model=List[EditorialDTO])
-def get_editorials(problemId: int, db: Session = Depends(get_db)):
+@router.get("/{problemId}/editorial", response_model=List[EditorialSummaryDTO], dependencies=[Depends(editorials_open)])
+def get_editorials(
+    problemId: int,
+    page: int = Query(0, ge=0),
+    size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    service = EditorialService(db)
+    return service.get_editorials(problemId, page, size)
+
+@router.get("/{problemId}/editorial/{editorialId}", response_model=EditorialDTO, dependencies=[Depends(editorials_open)])
+def get_editorial(problemId: int, editorialId: int, db: Session = Depends(get_db)):
     service = EditorialService(db)
-    return service.get_editorials(problemId)
+    editorial = service.get_editorial(problemId, editorialId)
+    if not editorial:
+        raise HTTPException(status_code=404, detail="Editorial not found")
+    return editorial
+
+@router.post("/{problemId}/editorial/{editorialId}/upvote", response_model=EditorialVoteDTO)
+def upvote_editorial(
+    problemId: int,
+    editorialId: int,
+    user_context: dict = Depends(security.get_current_user),
+    db: Session = Depends(get_db)
+):
+    result = EditorialService(db).vote(problemId, editorialId, user_context["id"], upvote=True)
+    if not result:
+        raise HTTPException(status_code=404, detail="Editorial not found")
+    return result
+
+@router.delete("/{problemId}/editorial/{editorialId}/upvote", response_model=EditorialVoteDTO)
+def remove_upvote(
+    problemId: int,
+    editorialId: int,
+    user_context: dict = Depends(security.get_current_user),
+    db: Session = Depends(get_db)
+):
+    result = EditorialService(db).vote(problemId, editorialId, user_context["id"], upvote=False)
+    if not result:
+        raise HTTPException(status_code=404, detail="Editorial not found")
+    return result
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from app.core import security
+from app.services.leaderboard_service import LeaderboardService
+from app.schemas.problem_schema import LeaderboardEntryDTO, LeaderboardRankDTO
+
+router = APIRouter(prefix="/api/v1/problem/leaderboard")
+
+SCOPES = ("global", "difficulty", "tag")
+
+def _validate_scope(scope: str, value: Optional[str]):
+    if scope not in SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(SCOPES)}")
+    if scope != "global" and not value:
+        raise HTTPException(status_code=400, detail=f"value is required for scope '{scope}'")
+
+@router.get("", response_model=List[LeaderboardEntryDTO])
+def get_leaderboard(
+    scope: str = "global",
+    value: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100)
+):
+    _validate_scope(scope, value)
+    return LeaderboardService.get_top(scope, value, limit)
+
+@router.get("/me", response_model=LeaderboardRankDTO)
+def get_my_rank(
+    scope: str = "global",
+    value: Optional[str] = None,
+    user: dict = Depends(security.get_current_user)
+):
+    _validate_scope(scope, value)
+    return LeaderboardService.get_rank(user["id"], scope, value)
@@ -1,18 +1,23 @@
 from fastapi import APIRouter, Depends, Query, Header, HTTPException
+from fastapi.responses import Response
 from typing import List, Optional
 from app.database import get_db
 from app.core import security
 from app.services.problem_service import ProblemService
 from sqlalchemy.orm import Session
-from app.services.submission_service import SubmissionService
-from app.schemas.problem_schema import  ProblemDTO, ProblemSendDTO, ProblemsMetaData, ProblemSummaryDTO, CodeRequest
+from app.services.submission_service import SubmissionService, SubmissionInProgress
+from app.schemas.problem_schema import  AutocompleteDTO, ProblemDTO, ProblemSendDTO, ProblemsMetaData, ProblemSummaryDTO, CodeRequest
 import uuid
 from app.schemas.problem_schema import TestDTO
 from app.core.sqs import send_to_queue, TEST_QUEUE_URL
 from app.services.cache_service import CacheService
-import time
+from app.services.autocomplete_service import AutocompleteService, MAX_SUGGESTIONS
+from app.services.cache_warmup_service import CacheWarmupService
+from app.services.contest_service import ContestService
+from app.services.stats_service import StatsService
+from app.services.rate_limiter_service import rate_limit
+from app.schemas.problem_schema import UserStatsDTO
 import logging
-from functools import wraps
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -20,17 +25,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/problem")
 
-def profile_time(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        logger.info(f"Execution time for {func.__name__}: {end_time - start_time:.4f} seconds")
-        return result
-    return wrapper
-
-@profile_time
+MAX_BATCH_SIZE = 100
+
 @router.get("/search")
 async def search(
     search: Optional[str] = None,
@@ -41,7 +37,7 @@ async def search(
     db=Depends(get_db)
 ):
     service = ProblemService(db)
-    content = service.search_problems(search, difficulty, tags, page, size)
+    content = StatsService.attach_problem_stats(service.search_problems(search, difficulty, tags, page, size))
     total = service.count_filtered_problems(search, difficulty, tags)
     return {
         "content": content,
@@ -49,7 +45,15 @@ async def search(
         "totalPages": (total + size - 1) // size
     }
 
-@router.post("/test")
+@router.get("/autocomplete", response_model=List[AutocompleteDTO])
+def autocomplete(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db)
+):
+    return AutocompleteService.suggest(db, q, limit)
+
+@router.post("/test", dependencies=[Depends(rate_limit("test"))])
 async def run_test_case(test_data: TestDTO):
     submission_id = str(uuid.uuid4())
     test_data.submissionId = submission_id
@@ -62,15 +66,22 @@ async def run_test_case(test_data: TestDTO):
         "submissionId": submission_id
     }
 
-@router.post("/submit")
+@router.post("/submit", dependencies=[Depends(rate_limit("submit", user_id_dependency=security.get_current_user_id))])
 async def submit(
     data: CodeRequest, 
-    authorization: str = Header(...), 
+    user: dict = Depends(security.get_current_user),
+    idempotency_key: Optional[str] = Header(None),
     db=Depends(get_db)
 ):
-    user_id = security.extract_user_id(authorization.split(" ")[1])
     service = SubmissionService(db)
-    res = await service.submit_code(data, int(user_id))
+    try:
+        res = await service.submit_code(data, user["id"], idempotency_key)
+    except SubmissionInProgress:
+        raise HTTPException(
+            status_code=409,
+            detail="A submission with this Idempotency-Key is still being processed",
+            headers={"Retry-After": "1"}
+        )
     return {"message": "Code submitted successfully", "submissionId": res}
 
 
@@ -79,8 +90,24 @@ async def get_status(submissionId: str, db=Depends(get_db)):
     service = SubmissionService(db)
     return await service.long_poll_submission(submissionId)
 
+@router.get("/problems/batch", response_model=List[ProblemSendDTO])
+def get_problems_batch(ids: List[str] = Query(...), db: Session = Depends(get_db)):
+    # Accepts ?ids=1,2,3 as well as ?ids=1&ids=2&ids=3
+    try:
+        problem_ids = [int(i) for raw in ids for i in raw.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be integers")
+    if len(problem_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} ids per request")
+    service = ProblemService(db)
+    return service.get_problems_by_ids(problem_ids)
+
 @router.get("/problem/{id}", response_model=ProblemSendDTO)
 def get_problem_by_id(id: int, db: Session = Depends(get_db)):
+    # Contest problems are served as frozen, pre-validated bytes
+    frozen = ContestService.problem_bytes(id)
+    if frozen is not None:
+        return Response(content=frozen, media_type="application/json")
     service = ProblemService(db)
     problem = service.get_problem_by_id(id)
     if not problem:
@@ -97,27 +124,33 @@ def get_problem_cnt_and_tags(db: Session = Depends(get_db)):
 
 @router.get("/recent", response_model=List[ProblemSummaryDTO])
 def get_recent_problems(
-    authorization: str = Header(...), 
+    user: dict = Depends(security.get_current_user),
     db: Session = Depends(get_db)
 ):
-    token = authorization.split(" ")[1]
-    user_id = security.extract_user_id(token)
-    
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-        
     service = ProblemService(db)
-    return service.get_problem_summary_recent(user_id)
+    return StatsService.attach_problem_stats(service.get_problem_summary_recent(user["id"]))
 
 @router.get("/problems", response_model=List[ProblemSummaryDTO])
 def get_all_problems(db: Session = Depends(get_db)):
     service = ProblemService(db)
-    return service.get_all_problems()
+    return StatsService.listing_with_stats(service.get_all_problems())
+
+@router.get("/stats/user/{userId}", response_model=UserStatsDTO)
+def get_user_stats(userId: int):
+    stats = StatsService.get_user_stats(userId)
+    return {
+        "userId": userId,
+        "easy": stats["problem_solved_easy"],
+        "medium": stats["problem_solved_medium"],
+        "hard": stats["problem_solved_hard"],
+        "total": stats["problem_solved_total"]
+    }
 
 @router.post("/addproblem", response_model=ProblemDTO)
 async def create_problem(problem: ProblemDTO, db: Session = Depends(get_db)):
     service = ProblemService(db)
     saved_problem = service.add_problem(problem)
+    CacheWarmupService.schedule()
     return saved_problem
 
 @router.delete("/{id}")
@@ -126,4 +159,5 @@ async def delete_problem(id: int, db: Session = Depends(get_db)):
     success = service.delete_problem(id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Problem with id {id} not found")
+    CacheWarmupService.schedule()
     return {"message": "Problem deleted successfully"}
\ No newline at end of file
@@ -6,29 +6,22 @@ from app.services.submission_service import SubmissionService
 from app.core import security
 from app.schemas.problem_schema import SubmissionResponse
 from app.services.cache_service import CacheService
-from app.schemas.problem_schema import TestDTO
+from app.schemas.problem_schema import TestDTO, VerdictDTO
+from app.services.verdict_service import VerdictService
 import asyncio
+import os
 
 router = APIRouter(prefix="/api/v1/problem/submissions")
 
 @router.get("/subuser/{problemId}", response_model=List[SubmissionResponse])
 async def get_user_submissions(
     problemId: int, 
-    authorization: str = Header(...), 
+    user: dict = Depends(security.get_current_user),
     db: Session = Depends(get_db)
 ):
-    # 1. Handle Authorization Header
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Invalid authorization header")
-    
-    token = authorization.split(" ")[1]
-    
-    # 2. Extract user_id using the Security module
-    user_id = security.extract_user_id(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    
-    # 3. Fetch data using Service
+    user_id = user["id"]
+
+    # Fetch data using Service
     service = SubmissionService(db)
     submissions = service.get_submissions_by_user_and_problem(user_id, problemId)
     
@@ -65,4 +58,20 @@ async def test_polling(submissionId: str):
         if not test_result:
             break # Safety break if object expires during polling
 
-    return test_result
\ No newline at end of file
+    return test_result
+
+@router.post("/results")
+def ingest_results(
+    verdicts: List[VerdictDTO],
+    x_judge_token: str = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Batched HTTP alternative to the result queue for judges that push verdicts directly.
+    """
+    expected = os.getenv("JUDGE_INGEST_TOKEN")
+    if not expected or x_judge_token != expected:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    service = VerdictService(db)
+    return {"updated": service.apply_verdicts(verdicts)}
@@ -1,22 +1,64 @@
-import redis
 import json
 import os
+from threading import Lock
+from app.core import metrics
 
-r = redis.from_url(
-    f"rediss://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}",
-    decode_responses=True
-)
+# REDIS_SSL=false only for local benchmark stacks
+redis_scheme = "rediss" if os.getenv('REDIS_SSL', 'true').lower() == 'true' else "redis"
+
+# Built on first use rather than at import: serverless cold starts only pay
+# for the redis import and client setup when a request actually needs Redis
+_client = None
+_client_lock = Lock()
+
+def get_redis():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import redis
+                client = redis.from_url(
+                    f"{redis_scheme}://:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}",
+                    decode_responses=True
+                )
+                _client = metrics.instrument_redis(client, "core")
+    return _client
+
+def __getattr__(name):
+    # Keeps `cache.r` working for callers while construction stays lazy
+    if name == "r":
+        return get_redis()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyScript:
+    """register_script() that defers client construction to the first call."""
+    def __init__(self, source: str):
+        self.source = source
+        self._script = None
+
+    def __call__(self, keys=[], args=[], client=None):
+        if self._script is None:
+            self._script = get_redis().register_script(self.source)
+        return self._script(keys=keys, args=args, client=client)
+
+def register_script(source: str) -> LazyScript:
+    return LazyScript(source)
 
 def set_cache(key, value, expiry=600):
     if isinstance(value, (dict, list)):
         value = json.dumps(value)
-    r.setex(key, expiry, str(value))
+    get_redis().setex(key, expiry, str(value))
 
 def get_cache(key, is_json=False):
-    data = r.get(key)
+    data = get_redis().get(key)
     if data and is_json:
         return json.loads(data)
     return data
 
 def delete_cache(key):
-    r.delete(key)
\ No newline at end of file
+    get_redis().delete(key)
+
+def pipeline():
+    """Non-transactional pipeline: batches many commands into one round-trip."""
+    return get_redis().pipeline(transaction=False)
@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+# Optional: brotli is preferred when installed, gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # fast enough to run per response
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+PUBLIC_SHORT = "public, max-age=30"
+PUBLIC = "public, max-age=300"
+PRIVATE = "private, no-cache"
+NO_STORE = "no-store"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Route template -> (Cache-Control, versioned). Versioned payloads carry a
+# "version" content hash, so a URL whose ?v= matches it is cached as immutable
+# (a stale or made-up v gets the normal policy). Routes not listed get no
+# Cache-Control and no validators.
+POLICIES: Dict[str, Tuple[str, bool]] = {
+    "/api/v1/problem/problem/{id}": (PUBLIC, True),
+    "/api/v1/problem/problems/batch": (PUBLIC, False),
+    "/api/v1/problem/problemCntAndTags": (PUBLIC, False),
+    "/api/v1/problem/problems": (PUBLIC_SHORT, False),   # carries live acceptance stats
+    "/api/v1/problem/search": (PUBLIC_SHORT, False),
+    "/api/v1/problem/autocomplete": (PUBLIC_SHORT, False),
+    "/api/v1/problem/{problemId}/editorial": (PUBLIC_SHORT, False),  # live upvotes
+    "/api/v1/problem/{problemId}/editorial/{editorialId}": (PUBLIC_SHORT, False),
+    "/api/v1/problem/leaderboard": (PUBLIC_SHORT, False),
+    "/api/v1/problem/contest": (PUBLIC_SHORT, False),
+    "/api/v1/problem/leaderboard/me": (PRIVATE, False),
+    "/api/v1/problem/recent": (PRIVATE, False),
+    "/api/v1/problem/stats/user/{userId}": (PRIVATE, False),
+    "/api/v1/problem/submissions/subuser/{problemId}": (PRIVATE, False),
+    "/api/v1/problem/submissions/{submissionId}": (NO_STORE, False),
+    "/api/v1/problem/submissions/test/{submissionId}": (NO_STORE, False),
+}
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks br or gzip from Accept-Encoding (q=0 excludes), preferring br."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def matches_version(body: bytes, query_string: bytes) -> bool:
+    """True if the request's ?v= equals the "version" in the JSON body."""
+    requested = parse_qs(query_string.decode("latin-1")).get("v")
+    if not requested:
+        return False
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and payload.get("version") is not None and payload["version"] == requested[0]
+
+def content_etag(body: bytes) -> str:
+    # Weak: the same representation is served gzip, brotli or identity
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def not_modified(headers: Dict[bytes, bytes], etag: str) -> bool:
+    """If-None-Match against the weak ETag (weak comparison). If-Modified-Since is not honoured."""
+    if_none_match = headers.get(b"if-none-match")
+    if if_none_match is None:
+        return False
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.decode("latin-1").split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class HttpCacheMiddleware:
+    """
+    Buffers each response, then for GET/HEAD 200s on a POLICIES route adds
+    Cache-Control and a weak ETag and answers If-None-Match with 304. No
+    Last-Modified: the ETag is a sufficient validator, and the middleware does
+    no I/O. Bodies over COMPRESSION_MIN_BYTES are compressed with the best
+    encoding the client accepts. Streaming responses are passed through.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope["headers"])
+        start_message = None
+        chunks = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    # Streaming: flush what we have and stop buffering
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                else:
+                    await self._finish(scope, request_headers, start_message, b"".join(chunks), send)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _finish(self, scope, request_headers, start_message, body: bytes, send):
+        status = start_message["status"]
+        headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+        header_names = {k.lower() for k, _ in headers}
+
+        route = getattr(scope.get("route"), "path", None)
+        policy = POLICIES.get(route)
+        if policy and scope["method"] in ("GET", "HEAD") and status == 200:
+            cache_control, versioned = policy
+            if versioned and matches_version(body, scope.get("query_string", b"")):
+                cache_control = IMMUTABLE
+            headers.append((b"cache-control", cache_control.encode()))
+
+            if cache_control != NO_STORE:
+                etag = content_etag(body)
+                headers.append((b"etag", etag.encode()))
+                if cache_control == PRIVATE:
+                    headers.append((b"vary", b"Authorization"))
+
+                if not_modified(request_headers, etag):
+                    headers = [(k, v) for k, v in headers if k.lower() != b"content-type"]
+                    await send({"type": "http.response.start", "status": 304, "headers": headers})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+        content_type = dict((k.lower(), v) for k, v in headers).get(b"content-type", b"").decode("latin-1")
+        if (
+            len(body) >= COMPRESSION_MIN_BYTES
+            and b"content-encoding" not in header_names
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            encoding = negotiate_encoding(request_headers.get(b"accept-encoding", b"").decode("latin-1"))
+            if encoding:
+                body = compress(body, encoding)
+                headers.append((b"content-encoding", encoding.encode()))
+            headers.append((b"vary", b"Accept-Encoding"))
+
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send(dict(start_message, headers=headers))
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+from functools import wraps
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from sqlalchemy import event
+
+# Exposed on GET /metrics in the Prometheus text format.
+# Label values are bounded (route templates, method names, command names) so
+# series count stays fixed no matter how many distinct ids are requested.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+SERVICE_CALL_SECONDS = Histogram(
+    "service_call_duration_seconds", "Service method latency",
+    ["method"], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds", "Redis round-trip time per command or pipeline",
+    ["client", "command"], buckets=LATENCY_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by tier (l1 = in-process, shared = cross-worker snapshot, l2 = Redis) and outcome",
+    ["tier", "result"]
+)
+
+SEARCH_CACHE_LOOKUPS = Counter(
+    "search_cache_lookups_total", "Search result/count cache lookups by the tier that answered (miss = database)",
+    ["kind", "result"]
+)
+
+def render():
+    """(body, content_type) for the /metrics endpoint."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Under gunicorn each worker writes its own files; aggregate them all
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+def record_cache(tier: str, hit: bool):
+    CACHE_LOOKUPS.labels(tier, "hit" if hit else "miss").inc()
+
+def record_search_cache(kind: str, tier=None):
+    """kind is page or count; tier is l1, l2 or None for a miss."""
+    SEARCH_CACHE_LOOKUPS.labels(kind, f"{tier}_hit" if tier else "miss").inc()
+
+def timed(func):
+    """Records the call's latency under service_call_duration_seconds{method=Class.method}."""
+    histogram = SERVICE_CALL_SECONDS.labels(func.__qualname__)
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+def instrument_engine(engine):
+    """Times every statement via SQLAlchemy cursor events (count = histogram _count)."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_SECONDS.labels(operation).observe(elapsed)
+
+def instrument_redis(client, name: str):
+    """
+    Wraps a redis-py client so every command (scripts included) and every
+    pipeline execute() is timed. Pipelines count as one round-trip.
+    """
+    execute_command = client.execute_command
+    make_pipeline = client.pipeline
+
+    def timed_execute_command(*args, **options):
+        start = time.perf_counter()
+        try:
+            return execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(name, str(args[0]).upper()).observe(time.perf_counter() - start)
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def timed_execute(*exec_args, **exec_kwargs):
+            start = time.perf_counter()
+            try:
+                return execute(*exec_args, **exec_kwargs)
+            finally:
+                REDIS_COMMAND_SECONDS.labels(name, "PIPELINE").observe(time.perf_counter() - start)
+        pipe.execute = timed_execute
+        return pipe
+
+    client.execute_command = timed_execute_command
+    client.pipeline = timed_pipeline
+    return client
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task overhead). Labels by the
+    matched route template, so /problem/1 and /problem/2 share one series.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            if path != "/metrics":
+                HTTP_REQUEST_SECONDS.labels(scope["method"], path, str(status["code"])).observe(
+                    time.perf_counter() - start
+                )
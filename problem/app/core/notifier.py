@@ -0,0 +1,86 @@
+import asyncio
+import json
+import logging
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+from app.core import cache
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "submissions:verdicts"
+
+class SubmissionNotifier:
+    """
+    Wake-up registry for long-polling requests.
+    Pollers wait on an event per submission id; the verdict consumer sets it
+    so the poller returns immediately instead of sleeping out its interval.
+    Wake-ups are also published on NOTIFY_CHANNEL, so pollers held by other
+    workers (gunicorn, other replicas) return just as early; without the
+    listener they fall back to their 1s re-check. Safe to notify from worker threads.
+    """
+    _waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+    _lock = Lock()
+    _listener = None
+
+    @classmethod
+    async def wait(cls, sub_id: str, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        entry = (loop, event)
+        with cls._lock:
+            cls._waiters.setdefault(sub_id, []).append(entry)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with cls._lock:
+                waiters = cls._waiters.get(sub_id)
+                if waiters and entry in waiters:
+                    waiters.remove(entry)
+                    if not waiters:
+                        del cls._waiters[sub_id]
+
+    @classmethod
+    def notify(cls, sub_ids: Iterable[str]):
+        sub_ids = list(sub_ids)
+        if not sub_ids:
+            return
+        cls._wake(sub_ids)
+        try:
+            cache.r.publish(NOTIFY_CHANNEL, json.dumps(sub_ids))
+        except Exception as e:
+            logger.error(f"Could not publish verdict wake-ups: {e}")
+
+    @classmethod
+    def start_listener(cls):
+        """Subscribes this worker to wake-ups published by the others (one Redis connection)."""
+        def on_message(message):
+            cls._wake(json.loads(message["data"]))
+
+        def on_error(e, pubsub, thread):
+            # Pollers still re-check every second; the thread stops until the next start
+            logger.error(f"Verdict wake-up listener stopped: {e}")
+            thread.stop()
+
+        try:
+            pubsub = cache.r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{NOTIFY_CHANNEL: on_message})
+            cls._listener = pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=on_error)
+        except Exception as e:
+            logger.error(f"Could not subscribe to verdict wake-ups: {e}")
+
+    @classmethod
+    def stop_listener(cls):
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    @classmethod
+    def _wake(cls, sub_ids: Iterable[str]):
+        with cls._lock:
+            entries = [e for sub_id in sub_ids for e in cls._waiters.get(sub_id, [])]
+        for loop, event in entries:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
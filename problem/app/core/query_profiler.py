@@ -0,0 +1,111 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Always-on and cheap: a counter bump and a dict update per statement.
+# EXPLAIN only runs for statements that were already slow, and the summary
+# header is only added when QUERY_DEBUG_HEADER=true.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+EXPLAIN_SLOW_QUERIES = os.getenv("EXPLAIN_SLOW_QUERIES", "true").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", 20))
+DEBUG_HEADER = os.getenv("QUERY_DEBUG_HEADER", "false").lower() == "true"
+
+
+class RequestQueries:
+    """Statements issued while serving one request."""
+    __slots__ = ("count", "seconds", "statements", "slow")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.slow = 0
+
+    def repeated(self) -> dict:
+        """Statements run at least N_PLUS_ONE_THRESHOLD times: the N+1 signature."""
+        return {s: n for s, n in self.statements.items() if n >= N_PLUS_ONE_THRESHOLD}
+
+    def summary(self) -> str:
+        return f"count={self.count}; time_ms={self.seconds * 1000:.1f}; slow={self.slow}; repeated={len(self.repeated())}"
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def current() -> Optional[RequestQueries]:
+    return _current.get()
+
+def _explain(conn, statement: str, parameters):
+    # Raw DBAPI cursor on the same connection: no engine events, no recursion
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN {statement}", parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profiler_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+            # Bound parameters stay out of the text, so a loop of lookups is one key
+            stats.statements[statement] += 1
+
+        if elapsed * 1000 < SLOW_QUERY_MS:
+            return
+        if stats is not None:
+            stats.slow += 1
+        plan = None
+        if EXPLAIN_SLOW_QUERIES and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                plan = f"EXPLAIN failed: {e}"
+        logger.warning(f"Slow query ({elapsed * 1000:.0f}ms): {statement}" + (f"\n{plan}" if plan else ""))
+
+
+class QueryProfilerMiddleware:
+    """
+    Opens a RequestQueries scope per HTTP request. Sync endpoints run in the
+    threadpool with a copy of this context, so they update the same object.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueries()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if DEBUG_HEADER and message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-query-stats", stats.summary().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            path = scope["path"]
+            repeated = stats.repeated()
+            for statement, n in repeated.items():
+                logger.warning(f"Possible N+1 on {scope['method']} {path}: statement ran {n} times: {statement}")
+            if stats.count > QUERY_COUNT_WARN:
+                logger.warning(f"{scope['method']} {path} issued {stats.count} statements ({stats.summary()})")
@@ -0,0 +1,29 @@
+import hashlib
+import json
+from typing import List, Optional, Tuple
+
+# Search cache keys are derived from the normalized query, never from raw user
+# input: spelling variants that Postgres answers identically share one entry,
+# and every key has the same short length however long the query was.
+
+def normalize(
+    search: Optional[str], difficulty: Optional[str], tags: Optional[List[str]]
+) -> Tuple[Optional[str], Optional[str], Optional[List[str]]]:
+    """
+    Canonical (search, difficulty, tags). Only rewrites that cannot change the
+    result set: plainto_tsquery('english') lowercases, stems and ANDs the words,
+    so case, spacing, word order and repeats are irrelevant; difficulty is
+    compared with LOWER(); tags match by array overlap, so order and repeats
+    are irrelevant (tags stay case-sensitive, as stored).
+    Stemming itself is left to Postgres: approximating its dictionary here
+    could merge queries that do not actually match the same problems.
+    """
+    words = sorted(set(search.lower().split())) if search else []
+    difficulty = difficulty.strip().lower() if difficulty else ""
+    tags = sorted({t.strip() for t in tags if t and t.strip()}) if tags else []
+    return " ".join(words) or None, difficulty or None, tags or None
+
+def search_key(prefix: str, *parts) -> str:
+    """prefix + 32 hex chars; the prefix keeps prefix/pattern invalidation working."""
+    digest = hashlib.blake2b(json.dumps(parts, separators=(",", ":")).encode(), digest_size=16).hexdigest()
+    return f"{prefix}:{digest}"
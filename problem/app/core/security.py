@@ -1,16 +1,24 @@
 import os
+import logging
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from fastapi import Depends, Header, HTTPException
 import bcrypt
 from dotenv import load_dotenv
+from app.shared.jwt_claims import ClaimsCache, bearer_token, subject_id, decode_token as _decode_token
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Must match the Secret Key in the User Service
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
 
+def decode_token(token: str) -> Optional[dict]:
+    """Verified claims (cached in ClaimsCache) or None if the token is invalid."""
+    return _decode_token(token, SECRET_KEY, ALGORITHM)
+
 def get_password_hash(password: str) -> str:
     """Hashes a password using bcrypt."""
     pwd_bytes = password.encode('utf-8')
@@ -30,45 +38,40 @@ def extract_user_id(token: str) -> Optional[int]:
     Equivalent to jwtService.extractUserId(token) in Java.
     Decodes the token and returns the 'sub' (subject) which is the user ID.
     """
-    try:
-        # Strip whitespace just like token.strip() in your Java code
-        payload = jwt.decode(token.strip(), SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str: str = payload.get("sub")
-        if user_id_str is None:
-            return None
-        return int(user_id_str)
-    except JWTError as e:
-        print(f"JWT Decode Error: {str(e)}")
-        return None
-    except ValueError:
-        return None
+    return subject_id(decode_token(token))
 
 def extract_user_context(token: str) -> dict:
     """
     Decodes the token and returns 'id' and 'username'.
     """
-    try:
-        payload = jwt.decode(token.strip(), SECRET_KEY, algorithms=[ALGORITHM])
-        user_id_str = payload.get("sub")
-        username = payload.get("username")
-        
-        if not user_id_str:
-            return None
-            
-        return {
-            "id": int(user_id_str),
-            "username": username
-        }
-    except JWTError:
-        return None
-    except ValueError:
+    payload = decode_token(token)
+    user_id = subject_id(payload)
+    if user_id is None:
         return None
+    return {"id": user_id, "username": payload.get("username")}
 
 def is_token_expired(token: str) -> bool:
     """Checks if the token is expired."""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        exp = payload.get("exp")
-        return datetime.utcfromtimestamp(exp) < datetime.utcnow()
-    except JWTError:
-        return True
\ No newline at end of file
+    payload = decode_token(token)
+    if payload is None or payload.get("exp") is None:
+        return True
+    return datetime.utcfromtimestamp(payload["exp"]) < datetime.utcnow()
+
+def get_optional_user(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+    """
+    Shared auth dependency: {'id', 'username'} or None. FastAPI caches dependency
+    results per request, so every consumer in a request shares one verification.
+    """
+    token = bearer_token(authorization)
+    return extract_user_context(token) if token else None
+
+def get_optional_user_id(user: Optional[dict] = Depends(get_optional_user)) -> Optional[int]:
+    return user["id"] if user else None
+
+def get_current_user(user: Optional[dict] = Depends(get_optional_user)) -> dict:
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return user
+
+def get_current_user_id(user: dict = Depends(get_current_user)) -> int:
+    return user["id"]
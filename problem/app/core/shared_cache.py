@@ -0,0 +1,92 @@
+import json
+import logging
+import mmap
+import os
+import re
+import tempfile
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+def _default_directory() -> str:
+    # tmpfs when available: snapshots never touch disk
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "codear-l1")
+
+class SharedCache:
+    """
+    Cross-process L1 for small, read-mostly values (problem count, tag list,
+    catalog). Each entry is a snapshot file replaced atomically on write and
+    read through mmap, so every worker on the host sees one copy. Workers
+    parse a snapshot once and reuse it until the file changes (checked with
+    a stat per read). Invalidation is deleting the file.
+    """
+    DIRECTORY = os.getenv("SHARED_L1_DIR") or _default_directory()
+
+    # Per-process parsed snapshots: name -> ((inode, mtime_ns, size), expiry, value)
+    _parsed: Dict[str, Tuple[Tuple[int, int, int], float, Any]] = {}
+    _lock = Lock()
+
+    @classmethod
+    def _path(cls, name: str) -> str:
+        return os.path.join(cls.DIRECTORY, re.sub(r"[^A-Za-z0-9_.-]", "_", name))
+
+    @classmethod
+    def get(cls, name: str) -> Optional[Any]:
+        path = cls._path(name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Missing, or the directory itself is unusable: either way a miss
+            metrics.record_cache("shared", False)
+            return None
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        with cls._lock:
+            parsed = cls._parsed.get(name)
+        if parsed is None or parsed[0] != signature:
+            try:
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    snapshot = json.loads(mm[:])
+            except (OSError, ValueError):
+                # Deleted or replaced mid-read (an empty file cannot be mapped either)
+                metrics.record_cache("shared", False)
+                return None
+            parsed = (signature, snapshot["expires"], snapshot["value"])
+            with cls._lock:
+                cls._parsed[name] = parsed
+
+        if parsed[1] is not None and time.time() >= parsed[1]:
+            metrics.record_cache("shared", False)
+            return None
+        metrics.record_cache("shared", True)
+        return parsed[2]
+
+    @classmethod
+    def set(cls, name: str, value: Any, ttl: Optional[float] = None):
+        snapshot = json.dumps({"expires": None if ttl is None else time.time() + ttl, "value": value})
+        tmp_path = None
+        try:
+            os.makedirs(cls.DIRECTORY, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cls.DIRECTORY, prefix=".tmp-")
+            with os.fdopen(fd, "w") as f:
+                f.write(snapshot)
+            # Atomic: readers see the old snapshot or the new one, never a partial file
+            os.replace(tmp_path, cls._path(name))
+        except OSError as e:
+            # A read-only or full filesystem only costs the L1; callers fall back to Redis
+            logger.error(f"Shared cache write failed for {name}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    @classmethod
+    def delete(cls, name: str):
+        try:
+            os.unlink(cls._path(name))
+        except FileNotFoundError:
+            pass
+        with cls._lock:
+            cls._parsed.pop(name, None)
@@ -1,29 +1,101 @@
-import boto3
 import json
 import os
+import uuid
+from collections import deque
+from threading import Condition, Lock
 from dotenv import load_dotenv
 
 load_dotenv()
 
-sqs_client = boto3.client(
-    'sqs',
-    region_name='ap-south-1',
-    aws_access_key_id=os.getenv('SQS_ACCESS_KEY'),
-    aws_secret_access_key=os.getenv('SQS_SECRET_KEY')
-)
+
+class LocalQueueClient:
+    """
+    In-memory stand-in for the boto3 SQS client (SQS_BACKEND=local).
+    Implements only the calls this service makes, with the same signatures.
+    """
+    def __init__(self):
+        self._queues = {}
+        self._in_flight = {}
+        self._cond = Condition()
+
+    def send_message(self, QueueUrl: str, MessageBody: str):
+        message_id = str(uuid.uuid4())
+        with self._cond:
+            self._queues.setdefault(QueueUrl, deque()).append((message_id, MessageBody))
+            self._cond.notify_all()
+        return {"MessageId": message_id}
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0, **kwargs):
+        messages = []
+        with self._cond:
+            queue = self._queues.setdefault(QueueUrl, deque())
+            # Mirror SQS long polling: block until a message arrives or the wait elapses
+            self._cond.wait_for(lambda: queue, timeout=WaitTimeSeconds)
+            while queue and len(messages) < MaxNumberOfMessages:
+                message_id, body = queue.popleft()
+                self._in_flight[message_id] = (QueueUrl, body)
+                messages.append({"MessageId": message_id, "ReceiptHandle": message_id, "Body": body})
+        return {"Messages": messages} if messages else {}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list):
+        with self._cond:
+            for entry in Entries:
+                self._in_flight.pop(entry["ReceiptHandle"], None)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+
+# boto3 import and client construction cost hundreds of milliseconds, so the
+# client is built on the first queue call instead of at import (cold starts)
+_sqs_client = None
+_sqs_lock = Lock()
+
+def get_sqs_client():
+    global _sqs_client
+    if _sqs_client is None:
+        with _sqs_lock:
+            if _sqs_client is None:
+                if os.getenv('SQS_BACKEND') == 'local':
+                    _sqs_client = LocalQueueClient()
+                else:
+                    import boto3
+                    _sqs_client = boto3.client(
+                        'sqs',
+                        region_name='ap-south-1',
+                        aws_access_key_id=os.getenv('SQS_ACCESS_KEY'),
+                        aws_secret_access_key=os.getenv('SQS_SECRET_KEY')
+                    )
+    return _sqs_client
 
 # Reconcile the names with your .env
-DEFAULT_QUEUE_URL = os.getenv('SQS_QUEUE_URL') 
+DEFAULT_QUEUE_URL = os.getenv('SQS_QUEUE_URL')
 TEST_QUEUE_URL = os.getenv('SQS_TEST_QUEUE')
+RESULT_QUEUE_URL = os.getenv('SQS_RESULT_QUEUE')
 
 def send_to_queue(message: dict, queue_url: str = None):
     # Use the provided URL, or fallback to the default from .env
     target_url = queue_url or DEFAULT_QUEUE_URL
-    
+
     if not target_url:
         raise ValueError("SQS Queue URL is not defined. Check your .env file.")
 
-    sqs_client.send_message(
+    get_sqs_client().send_message(
         QueueUrl=target_url,
         MessageBody=json.dumps(message)
-    )
\ No newline at end of file
+    )
+
+def receive_from_queue(queue_url: str, max_messages: int = 10, wait_seconds: int = 20) -> list:
+    """Long-polls the queue and returns the raw messages (at most 10, the SQS limit)."""
+    response = get_sqs_client().receive_message(
+        QueueUrl=queue_url,
+        MaxNumberOfMessages=min(max_messages, 10),
+        WaitTimeSeconds=wait_seconds
+    )
+    return response.get("Messages", [])
+
+def delete_from_queue(queue_url: str, messages: list):
+    if not messages:
+        return
+    get_sqs_client().delete_message_batch(
+        QueueUrl=queue_url,
+        Entries=[{"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]} for i, m in enumerate(messages)]
+    )
@@ -3,9 +3,10 @@ import urllib.parse
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import redis
+from threading import Lock
 from dotenv import load_dotenv
 from sqlalchemy.pool import NullPool
+from app.core import metrics, query_profiler
 
 
 load_dotenv()
@@ -17,15 +18,20 @@ db_port = os.getenv('DB_PORT')
 db_name = os.getenv('DB_NAME')
 
 encoded_password = urllib.parse.quote_plus(db_password)
+# Aiven Cloud requires TLS; DB_SSLMODE/REDIS_SSL only relax it for local benchmark stacks
+db_sslmode = os.getenv('DB_SSLMODE', 'require')
+redis_scheme = "rediss" if os.getenv('REDIS_SSL', 'true').lower() == 'true' else "redis"
 
 # Note: Added sslmode=require for Aiven Cloud
-SQLALCHEMY_DATABASE_URL = f"postgresql://{db_user}:{encoded_password}@{db_host}:{db_port}/{db_name}?sslmode=require"
+SQLALCHEMY_DATABASE_URL = f"postgresql://{db_user}:{encoded_password}@{db_host}:{db_port}/{db_name}?sslmode={db_sslmode}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    connect_args={"sslmode": "require"},
+    connect_args={"sslmode": db_sslmode},
     poolclass=NullPool
 )
+metrics.instrument_engine(engine)
+query_profiler.instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -38,7 +44,24 @@ def get_db():
 
 # --- Redis Configuration ---
 # Note: Aiven Redis requires rediss:// (SSL) and decode_responses=True
-redis_client = redis.from_url(
-    f"rediss://default:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}",
-    decode_responses=True
-)
\ No newline at end of file
+# Constructed on first use (see app.core.cache) to keep imports cheap on cold start
+_redis_client = None
+_redis_lock = Lock()
+
+def get_redis_client():
+    global _redis_client
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                import redis
+                client = redis.from_url(
+                    f"{redis_scheme}://default:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}",
+                    decode_responses=True
+                )
+                _redis_client = metrics.instrument_redis(client, "cache")
+    return _redis_client
+
+def __getattr__(name):
+    if name == "redis_client":
+        return get_redis_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
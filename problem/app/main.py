@@ -1,15 +1,19 @@
 import os
+import asyncio
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware  # Import this
 
-from app.api import problem_router, editorial_router
+from app.api import problem_router, editorial_router, leaderboard_router, contest_router
 from app.api.submission_router import router as sub_router
-from app.database import engine, Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.core import http_cache, metrics, query_profiler, sqs
+from app.core.notifier import SubmissionNotifier
+from app.services.verdict_service import VerdictConsumer
+from app.services.leaderboard_service import LeaderboardService
+from app.services.vote_service import VoteService
+from app.services.cache_warmup_service import CacheWarmupService
+from app.services.contest_service import ContestService
 
 app = FastAPI(
     title="Problem Microservice",
@@ -24,6 +28,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(http_cache.HttpCacheMiddleware)
+app.add_middleware(query_profiler.QueryProfilerMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 @app.exception_handler(Exception)
 async def runtime_exception_handler(request: Request, exc: Exception):
@@ -32,10 +39,61 @@ async def runtime_exception_handler(request: Request, exc: Exception):
         content={"message": str(exc)},
     )
 
+verdict_consumer = None
+
+@app.on_event("startup")
+async def start_verdict_consumer():
+    global verdict_consumer
+    if sqs.RESULT_QUEUE_URL:
+        verdict_consumer = VerdictConsumer(sqs.RESULT_QUEUE_URL)
+        verdict_consumer.start()
+
+@app.on_event("startup")
+async def schedule_leaderboard_reconciliation():
+    asyncio.create_task(LeaderboardService.run_nightly())
+
+@app.on_event("startup")
+async def warm_caches():
+    await CacheWarmupService.start()
+
+@app.on_event("startup")
+async def schedule_upvote_flush():
+    asyncio.create_task(VoteService.run_flusher())
+
+@app.on_event("startup")
+async def sync_contest_snapshot():
+    asyncio.create_task(ContestService.run_sync())
+
+@app.on_event("startup")
+async def listen_for_verdict_wakeups():
+    # Pollers on this worker wake up for verdicts applied by any worker
+    SubmissionNotifier.start_listener()
+
+@app.on_event("shutdown")
+async def stop_verdict_consumer():
+    if verdict_consumer:
+        verdict_consumer.stop()
+    SubmissionNotifier.stop_listener()
+
+# Before problem_router: its DELETE /{id} would otherwise capture /contest
+app.include_router(contest_router.router)
 app.include_router(problem_router.router)
 app.include_router(editorial_router.router)
 app.include_router(sub_router)
+app.include_router(leaderboard_router.router)
 
 @app.get("/api/v1/problem/health-check")
 async def health_check():
-    return "health is running"
\ No newline at end of file
+    return "health is running"
+
+@app.get("/api/v1/problem/ready")
+def readiness_check():
+    # Readiness probe: held back until the startup cache warm-up finishes
+    if not CacheWarmupService.is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,40 @@
+"""
+Schema management, run explicitly instead of on every import of app.main:
+
+    python -m app.migrate
+
+Creates missing tables, then any columns and indexes declared on the models
+that an existing table does not have yet (create_all skips tables that exist).
+Idempotent, safe to run on every deploy.
+
+The Docker image does not run it, and Vercel has no release step: run it
+against the target database before promoting a deploy that adds columns.
+Until it runs, search falls back to computing problems.search_vector inline
+(correct, but without the GIN index).
+"""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from app.database import engine, Base
+from app.models import problem  # noqa: F401  (registers the models on Base)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def migrate():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    # e.g. problems.search_vector, a generated column Postgres backfills itself
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}")
+                    logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+    logger.info(f"Schema up to date ({len(Base.metadata.tables)} tables)")
+
+if __name__ == "__main__":
+    migrate()
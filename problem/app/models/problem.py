@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, BigInteger, Boolean, Enum as SQLEnum, Index
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, ForeignKey, DateTime, Text, BigInteger, Boolean, Enum as SQLEnum, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 import datetime
 import enum
@@ -11,12 +11,22 @@ class SubmissionStatus(str, enum.Enum):
     FAILED = "FAILED"
     PASSED = "PASSED"
 
+# Title matches (A) rank above description matches (B)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
 class Problem(Base):
     __tablename__ = "problems"
     __table_args__ = (
         Index("idx_problem_title", "title"),
         Index("idx_problem_difficulty", "difficulty"),
+        Index("idx_problem_search_vector", "search_vector", postgresql_using="gin"),
     )
+    # Never RETURNING search_vector on INSERT/UPDATE: nothing reads it back, and it
+    # does not exist yet on a database that has not been migrated
+    __mapper_args__ = {"eager_defaults": False}
 
     id = Column(BigInteger, primary_key=True, index=True)
     title = Column(String)
@@ -28,6 +38,9 @@ class Problem(Base):
     tags = Column(ARRAY(String)) # columnDefinition = "text[]"
     time_limit_ms = Column(BigInteger)
     memory_limit_mb = Column(Integer)
+    # Maintained by Postgres (python -m app.migrate adds it to existing tables).
+    # Deferred so loading a Problem never pulls the vector.
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
 
     test_cases = relationship("TestCase", back_populates="problem", cascade="all, delete-orphan")
 class TestCase(Base):
@@ -36,7 +49,7 @@ class TestCase(Base):
     input = Column(Text)
     output = Column(Text)
     is_sample = Column(Boolean, default=False)
-    problem_id = Column(Integer, ForeignKey("problems.id"))
+    problem_id = Column(Integer, ForeignKey("problems.id"), index=True)
 
     problem = relationship("Problem", back_populates="test_cases")
 
@@ -58,6 +71,10 @@ class Submission(Base):
 
 class Editorial(Base):
     __tablename__ = "editorials"
+    __table_args__ = (
+        # Matches the listing's ORDER BY so it is an index range scan, no sort
+        Index("idx_editorial_problem_rank", "problem_id", text("is_admin DESC"), text("upvotes DESC")),
+    )
     id = Column(BigInteger, primary_key=True, index=True)
     problem_id = Column(BigInteger, ForeignKey("problems.id"))
     user_id = Column(BigInteger) # We don't have user table here, so just ID
@@ -67,4 +84,11 @@ class Editorial(Base):
     is_admin = Column(Boolean, default=False)
     upvotes = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, onupdate=datetime.datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, onupdate=datetime.datetime.utcnow)
+
+class VoteFlushBatch(Base):
+    # Upvote flush batches already added to editorials.upvotes, written in the
+    # same transaction so a retried batch is never applied twice (VoteService.flush)
+    __tablename__ = "vote_flush_batches"
+    batch_id = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=datetime.datetime.utcnow)
\ No newline at end of file
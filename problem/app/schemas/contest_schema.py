@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ContestDTO(BaseModel):
+    contestId: str
+    problemIds: List[int]
+    endsAt: Optional[datetime] = None  # open-ended until DELETE /contest
+
+class ContestStatusDTO(BaseModel):
+    contestId: str
+    problemIds: List[int]
+    endsAt: Optional[datetime] = None
+    version: str
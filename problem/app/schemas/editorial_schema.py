@@ -22,3 +22,26 @@ class EditorialDTO(BaseModel):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+class EditorialSummaryDTO(BaseModel):
+    # Listing entry: everything except the (potentially long) content
+    id: int
+    problemId: int = Field(..., alias="problem_id")
+    userId: int = Field(..., alias="user_id")
+    username: str
+    title: str
+    isAdmin: bool = Field(..., alias="is_admin")
+    upvotes: int
+    createdAt: datetime = Field(..., alias="created_at")
+    updatedAt: Optional[datetime] = Field(None, alias="updated_at")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class EditorialVoteDTO(BaseModel):
+    editorialId: int
+    upvoted: bool
+    upvotes: int
+    # False when the vote (or unvote) was already recorded
+    changed: bool
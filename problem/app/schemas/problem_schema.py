@@ -17,6 +17,11 @@ class ProblemSummaryDTO(BaseModel):
     title: str
     tags: List[str]
     difficulty: str
+    # Maintained incrementally by StatsService, never aggregated per request
+    attempts: int = 0
+    accepted: int = 0
+    acceptanceRate: float = 0.0
+    solvedBy: int = 0
 
     class Config:
         from_attributes = True
@@ -44,11 +49,36 @@ class ProblemSendDTO(BaseModel):
     timeLimitMs: int
     memoryLimitMb: int
     testCases: List[TestCaseDTO] = Field(default=[], alias="testCases")
+    # Content hash; /problem/{id}?v=<version> is cached as immutable while it matches
+    version: Optional[str] = None
 
     class Config:
         from_attributes = True
         populate_by_name = True
 
+class UserStatsDTO(BaseModel):
+    userId: int
+    easy: int = 0
+    medium: int = 0
+    hard: int = 0
+    total: int = 0
+
+class LeaderboardEntryDTO(BaseModel):
+    rank: int
+    userId: int
+    solved: int
+
+class LeaderboardRankDTO(BaseModel):
+    userId: int
+    rank: Optional[int] = None
+    solved: int = 0
+    totalRanked: int = 0
+
+class AutocompleteDTO(BaseModel):
+    id: int
+    title: str
+    difficulty: str
+
 class ProblemsMetaData(BaseModel):
     count: int
     tags: List[str]
@@ -69,6 +99,16 @@ class TestDTO(BaseModel):
     status: Optional[str] = "IN_PROGRESS"
     submissionId: Optional[str] = None
 
+class VerdictDTO(BaseModel):
+    # Judge result for one submission, as published on the result queue
+    submissionId: str
+    status: SubmissionStatus
+    result: Optional[str] = None
+    totalTests: Optional[int] = None
+    passedTests: Optional[int] = None
+    timeTakenMs: Optional[int] = None
+    memoryUsed: Optional[str] = None
+
 class SubmissionResponse(BaseModel):
     id: int
     # Alias maps database 'submission_id' to JSON 'submissionId'
@@ -0,0 +1,70 @@
+import bisect
+import re
+from threading import Lock
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core import metrics
+from app.services.problem_service import ProblemService
+
+MAX_SUGGESTIONS = 20
+WORD_START = re.compile(r"\b\w")
+
+class AutocompleteService:
+    """
+    Type-ahead over problem titles from a sorted in-memory array: every title
+    is indexed under each of its word starts ("two sum", "sum"), so a prefix
+    lookup is one bisect plus a short scan. The index is built from the
+    catalog snapshot (SharedCache) and rebuilt only when the indexed fields
+    change: a new snapshot object with the same titles (e.g. a reload from
+    Redis after the snapshot expired) just re-tags the existing index.
+    """
+    # (source catalog, fingerprint, keys, entries), replaced as a whole so readers
+    # never see keys from one build with entries from another. entries is parallel
+    # to keys: (starts_mid_title, title, id, difficulty)
+    _index: Tuple[Optional[list], Optional[int], Tuple[str, ...], Tuple[tuple, ...]] = (None, None, (), ())
+    _lock = Lock()
+
+    @staticmethod
+    def _fingerprint(catalog: list) -> int:
+        return hash(tuple((p["id"], p["title"], p["difficulty"]) for p in catalog))
+
+    @classmethod
+    def _rebuild(cls, catalog: list, fingerprint: int):
+        index = []
+        for p in catalog:
+            title = (p["title"] or "").strip()
+            lowered = title.lower()
+            for match in WORD_START.finditer(lowered):
+                index.append((lowered[match.start():], (match.start() > 0, title, p["id"], p["difficulty"])))
+        index.sort(key=lambda e: e[0])
+        cls._index = (catalog, fingerprint, tuple(k for k, _ in index), tuple(e for _, e in index))
+
+    @classmethod
+    @metrics.timed
+    def suggest(cls, db: Session, prefix: str, limit: int = 8) -> List[dict]:
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        catalog = ProblemService(db).get_all_problems()
+        source, _, keys, entries = cls._index
+        if catalog is not source:
+            # Same object is the common case (a SharedCache hit); otherwise
+            # compare contents, which costs a hash rather than a sort
+            fingerprint = cls._fingerprint(catalog)
+            with cls._lock:
+                _, current, keys, entries = cls._index
+                if fingerprint == current:
+                    cls._index = (catalog, current, keys, entries)
+                else:
+                    cls._rebuild(catalog, fingerprint)
+            _, _, keys, entries = cls._index
+        matches = {}
+        i = bisect.bisect_left(keys, prefix)
+        # Scan a bounded window: enough to rank title-start matches first
+        while i < len(keys) and keys[i].startswith(prefix) and len(matches) < limit * 5:
+            mid_title, title, problem_id, difficulty = entries[i]
+            if problem_id not in matches or not mid_title:
+                matches[problem_id] = (mid_title, title, problem_id, difficulty)
+            i += 1
+        ranked = sorted(matches.values(), key=lambda m: (m[0], len(m[1]), m[1]))[:limit]
+        return [{"id": problem_id, "title": title, "difficulty": difficulty} for _, title, problem_id, difficulty in ranked]
@@ -1,30 +1,113 @@
 import json
-from app.database import redis_client
+import os
+from collections import Counter
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from app.database import get_redis_client
+from app.core import metrics
+
+ACCESS_STATS_KEY = "cache:hot:"  # sorted set per kind: member -> decayed access count
+ACCESS_STATS_MAX_MEMBERS = 1000
+ACCESS_KINDS = ("problem", "search")
+# Scores halve every ACCESS_DECAY_SECONDS, so hotness reflects recent traffic
+# rather than all-time totals; members that decay below one access are dropped.
+ACCESS_DECAY_KEY = "cache:hot:decay:lock"
+ACCESS_DECAY_SECONDS = int(os.getenv("ACCESS_DECAY_SECONDS", 3600))
+ACCESS_DECAY_FACTOR = 0.5
+
+# Access counts buffered in-process and merged into Redis by flush_access_counts,
+# so recording a hit costs no round-trip
+_access_counts: Counter = Counter()
+_access_lock = Lock()
 
 class CacheService:
     @staticmethod
     def set_object(key: str, value: any, expire_seconds: int = 600):
         # Python equivalent of objectMapper.writeValueAsString
         json_data = json.dumps(value)
-        redis_client.setex(key, expire_seconds, json_data)
+        get_redis_client().setex(key, expire_seconds, json_data)
 
     @staticmethod
     def get_object(key: str):
-        data = redis_client.get(key)
+        data = get_redis_client().get(key)
+        metrics.record_cache("l2", data is not None)
         return json.loads(data) if data else None
 
+    @staticmethod
+    def get_many(keys: List[str]) -> List[Optional[Any]]:
+        """One MGET for all keys; None for each miss, in key order."""
+        if not keys:
+            return []
+        values = get_redis_client().mget(keys)
+        for v in values:
+            metrics.record_cache("l2", v is not None)
+        return [json.loads(v) if v else None for v in values]
+
+    @staticmethod
+    def set_many(items: Dict[str, Any], expire_seconds: int = 600):
+        """Writes all items in one pipelined round-trip."""
+        if not items:
+            return
+        pipe = get_redis_client().pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, expire_seconds, json.dumps(value))
+        pipe.execute()
+
     @staticmethod
     def delete(key: str):
-        redis_client.delete(key)
+        get_redis_client().delete(key)
         
     @staticmethod
     def get_value(key: str):
-        return redis_client.get(key)
+        data = get_redis_client().get(key)
+        metrics.record_cache("l2", data is not None)
+        return data
 
     @staticmethod
     def delete_pattern(pattern: str):
         count = 0
-        for key in redis_client.scan_iter(pattern):
-            redis_client.delete(key)
+        for key in get_redis_client().scan_iter(pattern):
+            get_redis_client().delete(key)
             count += 1
-        return count
\ No newline at end of file
+        return count
+
+    @staticmethod
+    def record_access(kind: str, member: str):
+        with _access_lock:
+            _access_counts[(kind, member)] += 1
+
+    @staticmethod
+    def flush_access_counts() -> int:
+        global _access_counts
+        with _access_lock:
+            counts, _access_counts = _access_counts, Counter()
+        if not counts:
+            return 0
+        pipe = get_redis_client().pipeline(transaction=False)
+        kinds = set()
+        for (kind, member), n in counts.items():
+            pipe.zincrby(f"{ACCESS_STATS_KEY}{kind}", n, member)
+            kinds.add(kind)
+        for kind in kinds:
+            # Keep only the hottest members
+            pipe.zremrangebyrank(f"{ACCESS_STATS_KEY}{kind}", 0, -ACCESS_STATS_MAX_MEMBERS - 1)
+        pipe.execute()
+        return len(counts)
+
+    @staticmethod
+    def decay_access_counts() -> bool:
+        """Applies one decay step, at most once per ACCESS_DECAY_SECONDS across all workers."""
+        r = get_redis_client()
+        if not r.set(ACCESS_DECAY_KEY, "1", nx=True, ex=ACCESS_DECAY_SECONDS):
+            return False
+        pipe = r.pipeline(transaction=False)
+        for kind in ACCESS_KINDS:
+            key = f"{ACCESS_STATS_KEY}{kind}"
+            pipe.zunionstore(key, {key: ACCESS_DECAY_FACTOR})
+            pipe.zremrangebyscore(key, "-inf", "(1")
+        pipe.execute()
+        return True
+
+    @staticmethod
+    def hottest(kind: str, limit: int) -> List[str]:
+        return get_redis_client().zrevrange(f"{ACCESS_STATS_KEY}{kind}", 0, limit - 1)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Optional
+from app.core import cache
+from app.database import SessionLocal
+from app.services.cache_service import CacheService
+from app.services.problem_service import ProblemService
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TOP_PROBLEMS = int(os.getenv("WARMUP_TOP_PROBLEMS", 200))
+WARMUP_TOP_SEARCHES = int(os.getenv("WARMUP_TOP_SEARCHES", 100))
+WARMUP_PAGE_SIZE = 10  # the /search default
+ACCESS_FLUSH_SECONDS = 60
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+# One startup warm-up per server start on a host: the L2 and the host's shared
+# snapshots are common to all its workers. The lock is held while it runs, the
+# done marker tells every worker of that start it may report ready.
+WARMUP_LOCK_KEY = "cache:warmup:lock:"
+WARMUP_LOCK_SECONDS = int(os.getenv("WARMUP_LOCK_SECONDS", 600))
+WARMUP_DONE_KEY = "cache:warmup:done:"
+WARMUP_DONE_SECONDS = 86400
+
+class CacheWarmupService:
+    """
+    Precomputes the hottest read-path entries (count, tag list, catalog, first
+    search pages, most-requested problems) into L2 and the L1s: the shared
+    snapshot for count, tags and catalog, this worker's LocalCache for the rest.
+    Runs once per host per server start, where it gates readiness, and again in
+    the background after every invalidation sweep. Hotness comes from the
+    access counts CacheService records on the read path.
+    """
+    _ready = False
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _task: Optional[asyncio.Task] = None
+    _rerun = False
+    # Set while this worker waits on (or runs) its host's startup warm-up
+    _boot: Optional[str] = None
+
+    @staticmethod
+    def warm(session_factory=SessionLocal) -> int:
+        """Fills the caches (misses only: warm entries short-circuit). Returns entries touched."""
+        db = session_factory()
+        try:
+            service = ProblemService(db)
+            touched = 0
+            service.get_problem_cnt()
+            tags = service.get_tags_for_problem()
+            service.get_all_problems()
+            touched += 3
+
+            searches = [(None, None, None, 0, WARMUP_PAGE_SIZE)]
+            searches += [(None, d, None, 0, WARMUP_PAGE_SIZE) for d in DIFFICULTIES]
+            searches += [(None, None, [t], 0, WARMUP_PAGE_SIZE) for t in tags]
+            for raw in CacheService.hottest("search", WARMUP_TOP_SEARCHES):
+                searches.append(tuple(json.loads(raw)))
+            for search, difficulty, search_tags, page, size in dict.fromkeys(
+                (s, d, tuple(t) if t else None, p, z) for s, d, t, p, z in searches
+            ):
+                search_tags = list(search_tags) if search_tags else None
+                # record=False: warming must not make its own entries look hot
+                service.search_problems(search, difficulty, search_tags, page, size, record=False)
+                service.count_filtered_problems(search, difficulty, search_tags)
+                touched += 2
+
+            for problem_id in CacheService.hottest("problem", WARMUP_TOP_PROBLEMS):
+                service.get_problem_by_id(int(problem_id), record=False)
+                touched += 1
+            return touched
+        finally:
+            db.close()
+
+    @staticmethod
+    def _boot_id() -> str:
+        """
+        This server start on this host. gunicorn.conf.py sets SERVER_BOOT_ID once
+        per start, so its workers share it and a restarted container (same
+        hostname) does not; a lone uvicorn process warms for itself.
+        """
+        return f"{socket.gethostname()}:{os.getenv('SERVER_BOOT_ID') or os.getpid()}"
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        if cls._ready or cls._boot is None or cls._task is not None:
+            return cls._ready
+        # Another worker is warming: ready once it marks this start done, or
+        # once its lock is gone without a marker (it died; serve cold)
+        try:
+            pipe = cache.r.pipeline()
+            pipe.exists(f"{WARMUP_DONE_KEY}{cls._boot}")
+            pipe.exists(f"{WARMUP_LOCK_KEY}{cls._boot}")
+            done, warming = pipe.execute()
+        except Exception as e:
+            logger.error(f"Cannot reach Redis for the warm-up marker, reporting ready: {e}")
+            done, warming = True, False
+        cls._ready = bool(done or not warming)
+        return cls._ready
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            cls._rerun = False
+            try:
+                touched = await asyncio.to_thread(cls.warm)
+                logger.info(f"Cache warm-up filled {touched} entries")
+            except Exception as e:
+                logger.error(f"Cache warm-up failed: {e}")
+            # Serving cold beats not serving: readiness opens even after a failure
+            cls._ready = True
+            if cls._boot is not None:
+                await asyncio.to_thread(cls._finish_startup_warmup, cls._boot)
+                cls._boot = None
+            if not cls._rerun:
+                return
+
+    @staticmethod
+    def _claim_startup_warmup(boot: str) -> Optional[bool]:
+        """True: this worker warms. False: another one is. None: already warmed."""
+        try:
+            if cache.r.exists(f"{WARMUP_DONE_KEY}{boot}"):
+                return None
+            return bool(cache.r.set(f"{WARMUP_LOCK_KEY}{boot}", os.getpid(), nx=True, ex=WARMUP_LOCK_SECONDS))
+        except Exception as e:
+            logger.error(f"Cannot reach Redis for the warm-up lock, warming anyway: {e}")
+            return True
+
+    @staticmethod
+    def _finish_startup_warmup(boot: str):
+        try:
+            pipe = cache.r.pipeline()
+            pipe.set(f"{WARMUP_DONE_KEY}{boot}", os.getpid(), ex=WARMUP_DONE_SECONDS)
+            pipe.delete(f"{WARMUP_LOCK_KEY}{boot}")
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Could not mark the startup warm-up done: {e}")
+
+    @classmethod
+    async def start(cls):
+        """
+        Startup hook: the first worker of this server start warms in the
+        background; every worker's is_ready() flips when it finishes. The
+        others then fill their own LocalCache from L2 as they serve.
+        """
+        cls._loop = asyncio.get_running_loop()
+        cls._boot = cls._boot_id()
+        claimed = await asyncio.to_thread(cls._claim_startup_warmup, cls._boot)
+        if claimed:
+            cls._task = asyncio.create_task(cls._run())
+        elif claimed is None:
+            cls._ready = True
+            cls._boot = None
+        else:
+            logger.info("Another worker on this host is warming the caches")
+        asyncio.create_task(cls._flush_access_counts())
+
+    @classmethod
+    def _schedule_on_loop(cls):
+        if cls._task is not None and not cls._task.done():
+            cls._rerun = True  # coalesce sweeps that land while a warm-up runs
+            return
+        cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    def schedule(cls):
+        """Re-warms after an invalidation sweep. Safe to call from worker threads."""
+        if cls._loop is not None and not cls._loop.is_closed():
+            cls._loop.call_soon_threadsafe(cls._schedule_on_loop)
+
+    @staticmethod
+    async def _flush_access_counts():
+        while True:
+            await asyncio.sleep(ACCESS_FLUSH_SECONDS)
+            try:
+                await asyncio.to_thread(CacheService.flush_access_counts)
+                await asyncio.to_thread(CacheService.decay_access_counts)
+            except Exception as e:
+                logger.error(f"Could not flush cache access counts: {e}")
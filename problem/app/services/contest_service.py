@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from types import MappingProxyType
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.core import cache
+from app.database import SessionLocal
+from app.schemas.problem_schema import ProblemSendDTO
+from app.services.problem_service import ProblemService
+
+logger = logging.getLogger(__name__)
+
+CONTEST_KEY = "contest:active"
+CONTEST_SYNC_SECONDS = int(os.getenv("CONTEST_SYNC_SECONDS", 5))
+
+class ContestSnapshot:
+    """
+    One contest's problems, validated and rendered to response bytes once.
+    Never mutated after construction: a new contest set builds a new
+    snapshot and replaces the reference in a single assignment.
+    """
+    def __init__(self, contest_id: str, version: str, ends_at: Optional[float], problems: dict):
+        self.contest_id = contest_id
+        self.version = version
+        self.ends_at = ends_at
+        self.problems = MappingProxyType(problems)  # problem id -> JSON bytes
+
+    def is_running(self) -> bool:
+        return self.ends_at is None or time.time() < self.ends_at
+
+
+class ContestService:
+    """
+    Contest mode. The declared problem set is pinned in every process as
+    pre-rendered ProblemSendDTO bytes (sample tests included), served without
+    touching Redis, the database or pydantic, and editorials for those problems
+    are locked until the contest ends. The definition lives in Redis; each
+    process polls it every CONTEST_SYNC_SECONDS and rebuilds on a new version.
+    Snapshots have no TTL: if Redis is unreachable the current one keeps serving.
+    """
+    _snapshot: Optional[ContestSnapshot] = None
+
+    @staticmethod
+    def _render(payloads: List[dict]) -> dict:
+        # Same validation and shape FastAPI's response_model would apply per request
+        return {p["id"]: ProblemSendDTO.model_validate(p).model_dump_json().encode() for p in payloads}
+
+    @classmethod
+    def _build(cls, db: Session, definition: dict) -> ContestSnapshot:
+        payloads = ProblemService(db).get_problems_by_ids(definition["problemIds"])
+        missing = set(definition["problemIds"]) - {p["id"] for p in payloads}
+        if missing:
+            logger.warning(f"Contest {definition['contestId']} references missing problems {sorted(missing)}")
+        return ContestSnapshot(definition["contestId"], definition["version"], definition["endsAt"], cls._render(payloads))
+
+    @classmethod
+    def activate(cls, db: Session, contest_id: str, problem_ids: List[int], ends_at: Optional[float]) -> dict:
+        """Declares the contest set. Raises ValueError for unknown problems or a past end time."""
+        if ends_at is not None and ends_at <= time.time():
+            raise ValueError("endsAt must be in the future")
+        problem_ids = list(dict.fromkeys(problem_ids))
+        definition = {"contestId": contest_id, "problemIds": problem_ids, "endsAt": ends_at, "version": str(time.time_ns())}
+        snapshot = cls._build(db, definition)
+        missing = [pid for pid in problem_ids if pid not in snapshot.problems]
+        if missing:
+            raise ValueError(f"Unknown problems: {missing}")
+
+        # The key expires with the contest so every process drops its snapshot then
+        cache.r.set(CONTEST_KEY, json.dumps(definition), exat=int(ends_at) + 1 if ends_at else None)
+        cls._snapshot = snapshot
+        return cls.status()
+
+    @classmethod
+    def deactivate(cls):
+        cache.r.delete(CONTEST_KEY)
+        cls._snapshot = None
+
+    @classmethod
+    def status(cls) -> Optional[dict]:
+        snapshot = cls._snapshot
+        if snapshot is None or not snapshot.is_running():
+            return None
+        return {
+            "contestId": snapshot.contest_id,
+            "problemIds": list(snapshot.problems),
+            "endsAt": snapshot.ends_at,
+            "version": snapshot.version,
+        }
+
+    @classmethod
+    def problem_bytes(cls, problem_id: int) -> Optional[bytes]:
+        """Frozen response body for a contest problem, None outside contest mode."""
+        snapshot = cls._snapshot
+        if snapshot is None or not snapshot.is_running():
+            return None
+        return snapshot.problems.get(problem_id)
+
+    @classmethod
+    def editorials_locked(cls, problem_id: int) -> bool:
+        snapshot = cls._snapshot
+        return snapshot is not None and snapshot.is_running() and problem_id in snapshot.problems
+
+    @classmethod
+    def sync(cls, session_factory=SessionLocal):
+        """Picks up a changed contest definition; the swap is one reference assignment."""
+        raw = cache.r.get(CONTEST_KEY)
+        if raw is None:
+            if cls._snapshot is not None:
+                logger.info(f"Contest {cls._snapshot.contest_id} ended; leaving contest mode")
+            cls._snapshot = None
+            return
+        definition = json.loads(raw)
+        if cls._snapshot is not None and cls._snapshot.version == definition["version"]:
+            return
+
+        db = session_factory()
+        try:
+            snapshot = cls._build(db, definition)
+        finally:
+            db.close()
+        cls._snapshot = snapshot
+        logger.info(f"Contest {snapshot.contest_id} pinned with {len(snapshot.problems)} problems")
+
+    @classmethod
+    async def run_sync(cls):
+        while True:
+            try:
+                await asyncio.to_thread(cls.sync)
+            except Exception as e:
+                # Keep serving the snapshot we have; never drop it on a transient error
+                logger.error(f"Contest sync failed: {e}")
+            await asyncio.sleep(CONTEST_SYNC_SECONDS)
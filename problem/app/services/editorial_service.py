@@ -2,15 +2,53 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc, case
 from app.models.problem import Editorial
 from app.schemas.editorial_schema import EditorialCreateDTO, EditorialDTO
-from typing import List
+from app.services.cache_service import CacheService
+from app.services.vote_service import VoteService
+from app.core.local_cache import LocalCache
+from typing import List, Optional
+from app.core import metrics
+
+EDITORIAL_LIST_KEY = "editorial:list:"        # ranked summaries (no content) per problem
+EDITORIAL_CONTENT_KEY = "editorial:content:"  # full editorial, keyed problem:editorial
+EDITORIAL_CACHE_SECONDS = 3600
+# Short L1 TTL: other workers' L1 only learns about new editorials by expiring
+EDITORIAL_LOCAL_TTL = 30
 
 class EditorialService:
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _to_dict(e, with_content: bool) -> dict:
+        data = {
+            "id": e.id,
+            "problemId": e.problem_id,
+            "userId": e.user_id,
+            "username": e.username,
+            "title": e.title,
+            "isAdmin": e.is_admin,
+            "upvotes": e.upvotes or 0,
+            # ISO strings so the dict can go to Redis as JSON unchanged
+            "createdAt": e.created_at.isoformat() if e.created_at else None,
+            "updatedAt": e.updated_at.isoformat() if e.updated_at else None
+        }
+        if with_content:
+            data["content"] = e.content
+        return data
+
+    @staticmethod
+    def invalidate(problem_id: int, editorial_id: Optional[int] = None):
+        key = f"{EDITORIAL_LIST_KEY}{problem_id}"
+        CacheService.delete(key)
+        LocalCache.delete(key)
+        if editorial_id is not None:
+            CacheService.delete(f"{EDITORIAL_CONTENT_KEY}{problem_id}:{editorial_id}")
+        else:
+            CacheService.delete_pattern(f"{EDITORIAL_CONTENT_KEY}{problem_id}:*")
+
     def add_editorial(self, dto: EditorialCreateDTO, user_id: int, username: str) -> Editorial:
         is_admin = (username == "admin")
-        
+
         editorial = Editorial(
             problem_id=dto.problemId,
             user_id=user_id,
@@ -19,33 +57,79 @@ class EditorialService:
             content=dto.content,
             is_admin=is_admin
         )
-        
+
         self.db.add(editorial)
         self.db.commit()
         self.db.refresh(editorial)
+        EditorialService.invalidate(dto.problemId, editorial.id)
         return editorial
 
-    def get_editorials(self, problem_id: int) -> List[dict]:
-        # Sort by is_admin descending (True first), then by upvotes descending
-        editorials = self.db.query(Editorial).filter(
+    def _get_ranked_summaries(self, problem_id: int) -> List[dict]:
+        key = f"{EDITORIAL_LIST_KEY}{problem_id}"
+
+        # L1
+        local_list = LocalCache.get(key)
+        if local_list is not None:
+            return local_list
+
+        # L2
+        cached_list = CacheService.get_object(key)
+        if cached_list is not None:
+            LocalCache.set(key, cached_list, ttl=EDITORIAL_LOCAL_TTL)
+            return cached_list
+
+        # Sort by is_admin descending (True first), then by upvotes descending;
+        # served by idx_editorial_problem_rank. Content is never loaded here.
+        rows = self.db.query(
+            Editorial.id, Editorial.problem_id, Editorial.user_id, Editorial.username, Editorial.title,
+            Editorial.is_admin, Editorial.upvotes, Editorial.created_at, Editorial.updated_at
+        ).filter(
             Editorial.problem_id == problem_id
         ).order_by(
             desc(Editorial.is_admin),
             desc(Editorial.upvotes)
         ).all()
 
-        return [
-            {
-                "id": e.id,
-                "problemId": e.problem_id,
-                "userId": e.user_id,
-                "username": e.username,
-                "title": e.title,
-                "content": e.content,
-                "isAdmin": e.is_admin,
-                "upvotes": e.upvotes,
-                "createdAt": e.created_at,
-                "updatedAt": e.updated_at
-            }
-            for e in editorials
-        ]
+        summaries = [EditorialService._to_dict(e, with_content=False) for e in rows]
+        CacheService.set_object(key, summaries, expire_seconds=EDITORIAL_CACHE_SECONDS)
+        LocalCache.set(key, summaries, ttl=EDITORIAL_LOCAL_TTL)
+        return summaries
+
+    @metrics.timed
+    def get_editorials(self, problem_id: int, page: int = 0, size: int = 20) -> List[dict]:
+        """Ranked editorial summaries (title/author/upvotes, no content), one page at a time."""
+        summaries = self._get_ranked_summaries(problem_id)
+
+        # Live Redis counters override the cached Postgres values, so the
+        # ranking follows votes immediately. Copies: cached dicts are shared.
+        live = VoteService.live_counts(s["id"] for s in summaries)
+        if live:
+            summaries = [dict(s, upvotes=live.get(s["id"], s["upvotes"])) for s in summaries]
+            summaries.sort(key=lambda s: (s["isAdmin"], s["upvotes"]), reverse=True)
+
+        offset = page * size
+        return summaries[offset:offset + size]
+
+    @metrics.timed
+    def get_editorial(self, problem_id: int, editorial_id: int) -> Optional[dict]:
+        key = f"{EDITORIAL_CONTENT_KEY}{problem_id}:{editorial_id}"
+        cached = CacheService.get_object(key)
+        if cached is None:
+            editorial = self.db.query(Editorial).filter(
+                Editorial.id == editorial_id,
+                Editorial.problem_id == problem_id
+            ).first()
+            if not editorial:
+                return None
+            cached = EditorialService._to_dict(editorial, with_content=True)
+            CacheService.set_object(key, cached, expire_seconds=EDITORIAL_CACHE_SECONDS)
+
+        live = VoteService.live_counts([editorial_id])
+        return dict(cached, upvotes=live.get(editorial_id, cached["upvotes"]))
+
+    def vote(self, problem_id: int, editorial_id: int, user_id: int, upvote: bool = True) -> Optional[dict]:
+        editorial = self.get_editorial(problem_id, editorial_id)
+        if not editorial:
+            return None
+        changed, upvotes = VoteService.vote(editorial_id, user_id, editorial["upvotes"] or 0, upvote)
+        return {"editorialId": editorial_id, "upvoted": upvote, "upvotes": upvotes, "changed": changed}
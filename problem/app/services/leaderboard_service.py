@@ -0,0 +1,152 @@
+import asyncio
+import datetime
+import json
+import logging
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core import cache
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "leaderboard:"
+RECONCILE_LOCK_KEY = "leaderboard:reconcile:lock"
+RECONCILE_ACTIVE_KEY = "leaderboard:reconcile:active"  # set while a rebuild runs
+RECONCILE_BUFFER_KEY = "leaderboard:reconcile:buffer"  # solves recorded meanwhile
+RECONCILE_HOUR_UTC = 3
+
+class LeaderboardService:
+    """
+    Rankings by distinct problems solved, kept in Redis sorted sets.
+    Boards: global, per difficulty and per tag. Scores are bumped on first solve
+    (see StatsService) and rebuilt nightly from Postgres by reconcile().
+    """
+    @staticmethod
+    def board_key(scope: str = "global", value: Optional[str] = None) -> str:
+        if scope == "global":
+            return f"{LEADERBOARD_KEY}global"
+        return f"{LEADERBOARD_KEY}{scope}:{(value or '').lower()}"
+
+    @staticmethod
+    def board_keys_for(difficulty: Optional[str], tags: Optional[List[str]]) -> List[str]:
+        keys = [LeaderboardService.board_key()]
+        if difficulty:
+            keys.append(LeaderboardService.board_key("difficulty", difficulty))
+        # Deduped after lowercasing: "DP" and "dp" are one board, incremented once
+        keys.extend(dict.fromkeys(LeaderboardService.board_key("tag", tag) for tag in tags or []))
+        return keys
+
+    @staticmethod
+    def get_top(scope: str = "global", value: Optional[str] = None, limit: int = 10) -> List[dict]:
+        entries = cache.r.zrevrange(LeaderboardService.board_key(scope, value), 0, limit - 1, withscores=True)
+        return [
+            {"rank": i + 1, "userId": int(user_id), "solved": int(score)}
+            for i, (user_id, score) in enumerate(entries)
+        ]
+
+    @staticmethod
+    def get_rank(user_id: int, scope: str = "global", value: Optional[str] = None) -> dict:
+        key = LeaderboardService.board_key(scope, value)
+        pipe = cache.pipeline()
+        pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+        pipe.zcard(key)
+        rank, score, total = pipe.execute()
+        return {
+            "userId": user_id,
+            "rank": rank + 1 if rank is not None else None,
+            "solved": int(score or 0),
+            "totalRanked": total
+        }
+
+    @staticmethod
+    def reconcile(db: Session) -> int:
+        """
+        Rebuilds every board from accepted submissions and swaps them in with RENAME,
+        so readers never see a half-built board. Returns the number of boards written.
+
+        Solves recorded while the rebuild runs land on the boards being replaced,
+        so _RECORD_SOLVE also buffers them. After the swap each buffered solve is
+        replayed unless the rebuild's own snapshot already counted it: both
+        queries run in one REPEATABLE READ transaction and see the same data.
+        """
+        internal = {RECONCILE_LOCK_KEY, RECONCILE_ACTIVE_KEY, RECONCILE_BUFFER_KEY}
+        pipe = cache.pipeline()
+        pipe.delete(RECONCILE_BUFFER_KEY)
+        pipe.set(RECONCILE_ACTIVE_KEY, "1", ex=3600)
+        pipe.execute()
+
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        try:
+            query = text("""
+                SELECT s.user_id, LOWER(p.difficulty) AS difficulty, p.tags
+                FROM (SELECT DISTINCT user_id, problem_id FROM submissions WHERE status = 'PASSED') s
+                JOIN problems p ON p.id = s.problem_id
+            """)
+            boards = {}
+            for r in db.execute(query):
+                for key in LeaderboardService.board_keys_for(r.difficulty, r.tags):
+                    board = boards.setdefault(key, {})
+                    board[r.user_id] = board.get(r.user_id, 0) + 1
+
+            stale = set(cache.r.scan_iter(f"{LEADERBOARD_KEY}*")) - set(boards) - internal
+            pipe = cache.pipeline()
+            for key, scores in boards.items():
+                tmp_key = f"{key}:rebuild"
+                pipe.delete(tmp_key)
+                pipe.zadd(tmp_key, scores)
+            pipe.execute()
+
+            # Swap, drain the buffer and clear the flag atomically: later solves
+            # increment the new boards directly
+            swap = cache.r.pipeline(transaction=True)
+            for key in boards:
+                swap.rename(f"{key}:rebuild", key)
+            for key in stale:
+                swap.delete(key)
+            swap.lrange(RECONCILE_BUFFER_KEY, 0, -1)
+            swap.delete(RECONCILE_BUFFER_KEY, RECONCILE_ACTIVE_KEY)
+            buffered = [json.loads(entry) for entry in swap.execute()[-2]]
+
+            if buffered:
+                pairs = {(int(user_id), int(problem_id)) for user_id, problem_id, _ in buffered}
+                counted = {
+                    (r.user_id, r.problem_id) for r in db.execute(text("""
+                        SELECT DISTINCT user_id, problem_id FROM submissions
+                        WHERE status = 'PASSED' AND (user_id, problem_id) IN (
+                            SELECT * FROM UNNEST(CAST(:users AS BIGINT[]), CAST(:problems AS BIGINT[]))
+                        )
+                    """), {"users": [u for u, _ in pairs], "problems": [p for _, p in pairs]})
+                }
+                pipe = cache.pipeline()
+                for user_id, problem_id, keys in buffered:
+                    if (int(user_id), int(problem_id)) not in counted:
+                        for key in keys:
+                            pipe.zincrby(key, 1, user_id)
+                pipe.execute()
+        finally:
+            db.rollback()  # read-only: ends the snapshot
+            cache.r.delete(RECONCILE_ACTIVE_KEY)
+        return len(boards)
+
+    @staticmethod
+    async def run_nightly(session_factory=SessionLocal):
+        """Runs reconcile() once a day; a Redis lock keeps it to one worker per night."""
+        while True:
+            now = datetime.datetime.utcnow()
+            next_run = now.replace(hour=RECONCILE_HOUR_UTC, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += datetime.timedelta(days=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+
+            if not cache.r.set(RECONCILE_LOCK_KEY, "1", nx=True, ex=3600):
+                continue
+            db = session_factory()
+            try:
+                count = await asyncio.to_thread(LeaderboardService.reconcile, db)
+                logger.info(f"Leaderboard reconciliation rebuilt {count} boards")
+            except Exception as e:
+                logger.error(f"Leaderboard reconciliation failed: {e}")
+            finally:
+                db.close()
@@ -1,37 +1,45 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, text
-from app.models.problem import Problem, Submission, TestCase, Editorial
+from app.models.problem import Problem, Submission, TestCase, Editorial, SEARCH_VECTOR_SQL
 from app.schemas.problem_schema import ProblemDTO, ProblemSendDTO, ProblemSummaryDTO
 from app.services.cache_service import CacheService
+from app.services.editorial_service import EditorialService
 from app.core.local_cache import LocalCache
+from app.core.shared_cache import SharedCache
+from app.core import metrics, search_keys
 from typing import List, Optional
+from types import SimpleNamespace
+import hashlib
 import json
-import time
 import logging
-from functools import wraps
+import time
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def profile_time(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        logger.info(f"Execution time for {func.__name__}: {end_time - start_time:.4f} seconds")
-        return result
-    return wrapper
+SEARCH_VECTOR_RECHECK_SECONDS = 300
+# L1 TTL (host snapshots and per-worker search results): a write only clears
+# the L1 on its own host, so this bounds how long other replicas serve stale data
+L1_TTL = 60
 
 class ProblemService:
+    # Search-cache generation this worker's L1 was filled under (see _sync_local_search)
+    _search_generation = None
+    # Whether problems.search_vector exists yet (see _search_vector_sql)
+    _has_search_vector: Optional[bool] = None
+    _search_vector_recheck_at = 0.0
+
     def __init__(self, db: Session):
         self.db = db
         # Cache Keys matching your Java service constants
         self.PROBLEM_KEY_PREFIX = "problem:id:"
         self.ALL_TAGS_KEY = "all_tags"
         self.PROBLEM_COUNT_KEY = "problem_count"
+        self.ALL_PROBLEMS_KEY = "all_problems_summary"
+        self.SEARCH_GENERATION_KEY = "search_generation"
         self.PROBLEM_SEARCH_KEY = "Search_problem"
+        self.PROBLEM_CACHE_SECONDS = 3600
 
     def add_problem(self, problem_dto: ProblemDTO) -> Problem:
         # 1. Initialize the Problem Model 
@@ -65,14 +73,13 @@ class ProblemService:
             self.db.refresh(db_problem)
 
             # 4. Clear Cache Keys
-            CacheService.delete("all_problems_summary")
+            CacheService.delete(self.ALL_PROBLEMS_KEY)
             # Ensure PROBLEM_COUNT_KEY is defined in your class or passed correctly
             CacheService.delete(self.PROBLEM_COUNT_KEY) 
             
             # Clear Local Cache
-            LocalCache.delete(self.PROBLEM_COUNT_KEY)
             LocalCache.invalidate_prefix(self.PROBLEM_SEARCH_KEY) # Invalidate all search results
-            LocalCache.delete(self.ALL_TAGS_KEY)
+            self._invalidate_shared()
 
             # Clear Redis Search Keys
             CacheService.delete_pattern(f"{self.PROBLEM_SEARCH_KEY}*")
@@ -84,9 +91,11 @@ class ProblemService:
             print(f"Error adding problem: {e}")
             raise e
 
-    @profile_time
-    def get_problem_by_id(self, problem_id: int):
+    @metrics.timed
+    def get_problem_by_id(self, problem_id: int, record: bool = True):
         key = f"{self.PROBLEM_KEY_PREFIX}{problem_id}"
+        if record:
+            CacheService.record_access("problem", str(problem_id))
         
         # 1. Try Cache
         cached_problem = CacheService.get_object(key)
@@ -94,58 +103,141 @@ class ProblemService:
             return cached_problem
             
         # 2. Query DB
-        # Use joinedload to eagerly load test_cases if not already handled by lazy loading efficiently enough
-        # But here we filter in Python for simplicity as the number of TCs isn't massive, just their content could be.
-        # Alternatively, we could filter in the query itself:
-        # db_problem = self.db.query(Problem).options(joinedload(Problem.test_cases)).filter(Problem.id == problem_id).first()
-        
         db_problem = self.db.query(Problem).filter(Problem.id == problem_id).first()
         
         if not db_problem:
             return None
             
         # 3. Map to DTO format
-        # Filter test cases: Only return IS_SAMPLE ones
-        public_test_cases = [tc for tc in db_problem.test_cases if tc.is_sample]
-
-        problem_data = {
-            "id": db_problem.id,
-            "title": db_problem.title,
-            "description": db_problem.description,
-            "inputDescription": db_problem.input_description,
-            "outputDescription": db_problem.output_description,
-            "constraints": db_problem.constraints,
-            "difficulty": db_problem.difficulty,
-            "tags": db_problem.tags or [],
-            "timeLimitMs": db_problem.time_limit_ms,
-            "memoryLimitMb": db_problem.memory_limit_mb,
+        # Only IS_SAMPLE test cases are public: filter in SQL instead of lazy-loading
+        # every (potentially huge) hidden case through db_problem.test_cases
+        public_test_cases = self.db.query(TestCase.id, TestCase.input, TestCase.output, TestCase.is_sample).filter(
+            TestCase.problem_id == problem_id, TestCase.is_sample.is_(True)
+        ).order_by(TestCase.id).all()
+
+        problem_data = self._problem_payload(db_problem, public_test_cases)
+        
+        # 4. Set Cache
+        CacheService.set_object(key, problem_data, expire_seconds=self.PROBLEM_CACHE_SECONDS)
+        return problem_data
+
+    @staticmethod
+    def _problem_payload(p, sample_test_cases) -> dict:
+        payload = {
+            "id": p.id,
+            "title": p.title,
+            "description": p.description,
+            "inputDescription": p.input_description,
+            "outputDescription": p.output_description,
+            "constraints": p.constraints,
+            "difficulty": p.difficulty,
+            "tags": p.tags or [],
+            "timeLimitMs": p.time_limit_ms,
+            "memoryLimitMb": p.memory_limit_mb,
             "testCases": [
                 {
                     "id": tc.id,
                     "input": tc.input,
                     "output": tc.output,
                     "isSample": tc.is_sample
-                } for tc in public_test_cases
+                } for tc in sample_test_cases
             ]
         }
-        
-        # 4. Set Cache
-        CacheService.set_object(key, problem_data, expire_seconds=3600)
-        return problem_data
+        # Changes whenever anything served for the problem does
+        canonical = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        payload["version"] = hashlib.blake2b(canonical, digest_size=8).hexdigest()
+        return payload
+
+    @metrics.timed
+    def get_problems_by_ids(self, problem_ids: List[int]) -> List[dict]:
+        """
+        Bulk get_problem_by_id: one MGET for all ids, one query for the misses
+        (with their sample test cases), one pipelined backfill. Results follow
+        the requested order; unknown ids are left out.
+        """
+        problem_ids = list(dict.fromkeys(problem_ids))
+        for problem_id in problem_ids:
+            CacheService.record_access("problem", str(problem_id))
 
-    @profile_time
+        keys = [f"{self.PROBLEM_KEY_PREFIX}{problem_id}" for problem_id in problem_ids]
+        found = {
+            problem_id: cached
+            for problem_id, cached in zip(problem_ids, CacheService.get_many(keys))
+            if cached and "testCases" in cached
+        }
+
+        misses = [problem_id for problem_id in problem_ids if problem_id not in found]
+        if misses:
+            rows = self.db.execute(text("""
+                SELECT p.id, p.title, p.description, p.input_description, p.output_description, p.constraints,
+                       p.difficulty, p.tags, p.time_limit_ms, p.memory_limit_mb,
+                       tc.id AS tc_id, tc.input AS tc_input, tc.output AS tc_output
+                FROM problems p
+                LEFT JOIN test_cases tc ON tc.problem_id = p.id AND tc.is_sample
+                WHERE p.id = ANY(:ids)
+                ORDER BY p.id, tc.id
+            """), {"ids": misses}).fetchall()
+
+            problems, samples = {}, {}
+            for r in rows:
+                problems.setdefault(r.id, r)
+                if r.tc_id is not None:
+                    samples.setdefault(r.id, []).append(
+                        SimpleNamespace(id=r.tc_id, input=r.tc_input, output=r.tc_output, is_sample=True)
+                    )
+            loaded = {pid: self._problem_payload(p, samples.get(pid, [])) for pid, p in problems.items()}
+            CacheService.set_many(
+                {f"{self.PROBLEM_KEY_PREFIX}{pid}": data for pid, data in loaded.items()},
+                expire_seconds=self.PROBLEM_CACHE_SECONDS
+            )
+            found.update(loaded)
+
+        return [found[problem_id] for problem_id in problem_ids if problem_id in found]
+
+    @metrics.timed
+    def _invalidate_shared(self):
+        # Count, tags and catalog live in the cross-worker L1 (one snapshot per host)
+        SharedCache.delete(self.PROBLEM_COUNT_KEY)
+        SharedCache.delete(self.ALL_TAGS_KEY)
+        SharedCache.delete(self.ALL_PROBLEMS_KEY)
+        # Search results stay per-worker; bumping the generation tells the other
+        # workers to drop theirs on their next search
+        SharedCache.set(self.SEARCH_GENERATION_KEY, time.time_ns())
+        ProblemService._search_generation = SharedCache.get(self.SEARCH_GENERATION_KEY)
+
+    def _sync_local_search(self):
+        generation = SharedCache.get(self.SEARCH_GENERATION_KEY)
+        if generation != ProblemService._search_generation:
+            LocalCache.invalidate_prefix(self.PROBLEM_SEARCH_KEY)
+            ProblemService._search_generation = generation
+
+    @metrics.timed
     def get_all_problems(self) -> List[dict]:
         """Equivalent to Java findAllSummaries."""
+        # L1: shared across workers
+        local_list = SharedCache.get(self.ALL_PROBLEMS_KEY)
+        if local_list is not None:
+            return local_list
+
+        # L2
+        cached_list = CacheService.get_object(self.ALL_PROBLEMS_KEY)
+        if cached_list is not None:
+            SharedCache.set(self.ALL_PROBLEMS_KEY, cached_list, ttl=L1_TTL)
+            return cached_list
+
         db_list = self.db.query(Problem.id, Problem.title, Problem.tags, Problem.difficulty).all()
-        return [
+        problems = [
             {"id": p.id, "title": p.title, "tags": p.tags or [], "difficulty": p.difficulty} 
             for p in db_list
         ]
+        CacheService.set_object(self.ALL_PROBLEMS_KEY, problems, expire_seconds=1800)
+        SharedCache.set(self.ALL_PROBLEMS_KEY, problems, ttl=L1_TTL)
+        return problems
 
-    @profile_time
+    @metrics.timed
     def get_problem_cnt(self) -> int:
-        # L1: Local Cache
-        local_count = LocalCache.get(self.PROBLEM_COUNT_KEY)
+        # L1: shared across workers
+        local_count = SharedCache.get(self.PROBLEM_COUNT_KEY)
         if local_count is not None:
             return int(local_count)
 
@@ -153,27 +245,27 @@ class ProblemService:
         cached_count = CacheService.get_value(self.PROBLEM_COUNT_KEY)
         if cached_count:
             # Populate L1
-            LocalCache.set(self.PROBLEM_COUNT_KEY, int(cached_count), ttl=None)
+            SharedCache.set(self.PROBLEM_COUNT_KEY, int(cached_count), ttl=L1_TTL)
             return int(cached_count)
             
         count = self.db.query(Problem).count()
         
         # Set L2 and L1
         CacheService.set_object(self.PROBLEM_COUNT_KEY, count, expire_seconds=1800)
-        LocalCache.set(self.PROBLEM_COUNT_KEY, count, ttl=None)
+        SharedCache.set(self.PROBLEM_COUNT_KEY, count, ttl=L1_TTL)
         return count
 
-    @profile_time
+    @metrics.timed
     def get_tags_for_problem(self) -> List[str]:
         # L1
-        local_tags = LocalCache.get(self.ALL_TAGS_KEY)
+        local_tags = SharedCache.get(self.ALL_TAGS_KEY)
         if local_tags:
             return local_tags
 
         # L2
         cached_tags = CacheService.get_object(self.ALL_TAGS_KEY)
         if cached_tags:
-            LocalCache.set(self.ALL_TAGS_KEY, cached_tags, ttl=None)
+            SharedCache.set(self.ALL_TAGS_KEY, cached_tags, ttl=L1_TTL)
             return cached_tags
             
         query = text("SELECT DISTINCT UNNEST(tags) as tag FROM problems WHERE tags IS NOT NULL")
@@ -181,34 +273,62 @@ class ProblemService:
         tags = sorted([r.tag for r in result if r.tag])
         
         CacheService.set_object(self.ALL_TAGS_KEY, tags, expire_seconds=86400)
-        LocalCache.set(self.ALL_TAGS_KEY, tags, ttl=None)
+        SharedCache.set(self.ALL_TAGS_KEY, tags, ttl=L1_TTL)
         return tags
 
-    @profile_time
-    def search_problems(self, search: Optional[str], difficulty: Optional[str], tags: Optional[List[str]], page: int, size: int):
-        tags_str = ",".join(sorted(tags)) if tags else "None"
-        cache_key = f"{self.PROBLEM_SEARCH_KEY}:{search or 'None'}:{difficulty or 'None'}:{tags_str}:{page}:{size}"
+    def _search_vector_sql(self) -> str:
+        """
+        p.search_vector, or the same expression computed inline while the
+        column does not exist yet (a deploy that skipped python -m app.migrate,
+        e.g. on Vercel). Both forms return identical matches and ranks; only the
+        GIN index is missing. Presence is re-checked every few minutes until found.
+        """
+        cls = ProblemService
+        if cls._has_search_vector is not True and time.time() >= cls._search_vector_recheck_at:
+            cls._has_search_vector = self.db.execute(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'problems' AND column_name = 'search_vector'"
+            )).first() is not None
+            cls._search_vector_recheck_at = time.time() + SEARCH_VECTOR_RECHECK_SECONDS
+            if not cls._has_search_vector:
+                logger.warning("problems.search_vector is missing; searching unindexed until python -m app.migrate runs")
+        return "p.search_vector" if cls._has_search_vector else f"({SEARCH_VECTOR_SQL})"
+
+    @metrics.timed
+    def search_problems(self, search: Optional[str], difficulty: Optional[str], tags: Optional[List[str]], page: int, size: int, record: bool = True):
+        search, difficulty, tags = search_keys.normalize(search, difficulty, tags)
+        cache_key = search_keys.search_key(self.PROBLEM_SEARCH_KEY, search, difficulty, tags, page, size)
+        if record:
+            CacheService.record_access("search", json.dumps([search, difficulty, tags, page, size]))
+        self._sync_local_search()
         
         # L1
         local_result = LocalCache.get(cache_key)
         if local_result:
+            metrics.record_search_cache("page", "l1")
             return local_result
 
         # L2
         cached_result = CacheService.get_object(cache_key)
         if cached_result:
-            LocalCache.set(cache_key, cached_result, ttl=None)
+            LocalCache.set(cache_key, cached_result, ttl=L1_TTL)
+            metrics.record_search_cache("page", "l2")
             return cached_result
+        metrics.record_search_cache("page", None)
 
         offset = page * size
         tag_str = ",".join(tags) if tags else None
         
-        query = text("""
+        # Text searches are ranked (title weight A outranks description weight B);
+        # plain filters keep the stable id order
+        vector = self._search_vector_sql()
+        order_by = f"ts_rank({vector}, plainto_tsquery('english', :search)) DESC, p.id" if search else "p.id"
+        query = text(f"""
             SELECT id, title, tags, difficulty FROM problems p
-            WHERE (:search IS NULL OR :search = '' OR to_tsvector('english', p.title || ' ' || p.description) @@ plainto_tsquery(:search))
+            WHERE (:search IS NULL OR :search = '' OR {vector} @@ plainto_tsquery('english', :search))
             AND (:difficulty IS NULL OR :difficulty = '' OR LOWER(p.difficulty) = LOWER(:difficulty))
             AND (:tags IS NULL OR :tags = '' OR p.tags && string_to_array(:tags, ','))
-            ORDER BY p.id LIMIT :limit OFFSET :offset
+            ORDER BY {order_by} LIMIT :limit OFFSET :offset
         """)
         
         result = self.db.execute(query, {
@@ -218,35 +338,40 @@ class ProblemService:
         
         data = [{"id": r.id, "title": r.title, "tags": r.tags or [], "difficulty": r.difficulty} for r in result]
         CacheService.set_object(cache_key, data, expire_seconds=300)
-        LocalCache.set(cache_key, data, ttl=None)
+        LocalCache.set(cache_key, data, ttl=L1_TTL)
         return data
 
-    @profile_time
+    @metrics.timed
     def count_filtered_problems(self, search: Optional[str], difficulty: Optional[str], tags: Optional[List[str]]):
-        tags_str = ",".join(sorted(tags)) if tags else "None"
-        cache_key = f"{self.PROBLEM_SEARCH_KEY}_count:{search or 'None'}:{difficulty or 'None'}:{tags_str}"
+        search, difficulty, tags = search_keys.normalize(search, difficulty, tags)
+        cache_key = search_keys.search_key(f"{self.PROBLEM_SEARCH_KEY}_count", search, difficulty, tags)
+        self._sync_local_search()
         
         # L1
         local_count = LocalCache.get(cache_key)
         if local_count is not None:
+             metrics.record_search_cache("count", "l1")
              return int(local_count)
 
         # L2
         cached_count = CacheService.get_value(cache_key)
         if cached_count is not None:
-            LocalCache.set(cache_key, int(cached_count), ttl=None)
+            LocalCache.set(cache_key, int(cached_count), ttl=L1_TTL)
+            metrics.record_search_cache("count", "l2")
             return int(cached_count)
+        metrics.record_search_cache("count", None)
 
         tag_str = ",".join(tags) if tags else None
-        query = text("""
+        vector = self._search_vector_sql()
+        query = text(f"""
             SELECT COUNT(*) FROM problems p
-            WHERE (:search IS NULL OR :search = '' OR to_tsvector('english', p.title || ' ' || p.description) @@ plainto_tsquery(:search))
+            WHERE (:search IS NULL OR :search = '' OR {vector} @@ plainto_tsquery('english', :search))
             AND (:difficulty IS NULL OR :difficulty = '' OR LOWER(p.difficulty) = LOWER(:difficulty))
             AND (:tags IS NULL OR :tags = '' OR p.tags && string_to_array(:tags, ','))
         """)
         count = self.db.execute(query, {"search": search, "difficulty": difficulty, "tags": tag_str}).scalar()
         CacheService.set_object(cache_key, count, expire_seconds=300)
-        LocalCache.set(cache_key, count, ttl=None)
+        LocalCache.set(cache_key, count, ttl=L1_TTL)
         return count
 
     def get_problem_summary_recent(self, user_id: int):
@@ -290,14 +415,14 @@ class ProblemService:
             # 3. Clear Caches
             key = f"{self.PROBLEM_KEY_PREFIX}{problem_id}"
             CacheService.delete(key)
-            CacheService.delete("all_problems_summary")
+            CacheService.delete(self.ALL_PROBLEMS_KEY)
             CacheService.delete(self.PROBLEM_COUNT_KEY)
             CacheService.delete(self.ALL_TAGS_KEY)
             CacheService.delete_pattern(f"{self.PROBLEM_SEARCH_KEY}*")
+            EditorialService.invalidate(problem_id)
             
-            LocalCache.delete(self.PROBLEM_COUNT_KEY)
             LocalCache.invalidate_prefix(self.PROBLEM_SEARCH_KEY)
-            LocalCache.delete(self.ALL_TAGS_KEY) # Tags might change
+            self._invalidate_shared() # Tags might change
             
             return True
         except Exception as e:
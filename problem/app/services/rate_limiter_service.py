@@ -0,0 +1,19 @@
+from app.core import cache, security
+from app.shared.rate_limit import TOKEN_BUCKET_LUA, TokenBucketLimiter, policy, rate_limit_dependency
+
+# route -> (per-subject bucket, global bucket)
+POLICIES = {
+    "submit": (policy("submit", 10, 60), policy("submit_global", 3000, 60)),
+    "test": (policy("test", 20, 60), policy("test_global", 3000, 60)),
+}
+
+# Fails open: a Redis outage should not stop people submitting
+limiter = TokenBucketLimiter(cache.register_script(TOKEN_BUCKET_LUA), POLICIES)
+
+def rate_limit(route: str, detail: str = "Too many requests. Please slow down.", user_id_dependency=security.get_optional_user_id):
+    """
+    FastAPI dependency enforcing POLICIES[route]; keyed by user id, else client IP.
+    Routes that require a login pass security.get_current_user_id, so an
+    unauthenticated request gets its 401 before it can spend any tokens.
+    """
+    return rate_limit_dependency(limiter, route, user_id_dependency, detail)
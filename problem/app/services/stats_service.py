@@ -0,0 +1,107 @@
+from typing import List
+from app.core import cache, metrics
+from app.core.local_cache import LocalCache
+from app.services.leaderboard_service import LeaderboardService, RECONCILE_ACTIVE_KEY, RECONCILE_BUFFER_KEY
+
+# Key layout shared with the user service (it reads USER_STATS_KEY for profiles)
+PROBLEM_STATS_KEY = "problem:stats:"      # hash: attempts, accepted
+PROBLEM_SOLVERS_KEY = "problem:solvers:"  # HyperLogLog of distinct solving users
+USER_SOLVED_KEY = "user:solved:"          # set of solved problem ids
+USER_STATS_KEY = "user:stats:"            # hash: problem_solved_easy/medium/hard/total
+USER_PROFILE_KEY = "user:profile:"        # user service's cached profile, stale after a new solve
+
+# The full listing with stats, per worker: enriching the whole catalog is a
+# pipeline of two commands per problem. Same freshness as its max-age=30.
+LISTING_STATS_KEY = "problems:with_stats"
+LISTING_STATS_TTL = 30
+
+# Counts a solve only the first time this user solves this problem.
+# KEYS[3] is the user's cached profile; KEYS[4]/KEYS[5] are the reconcile flag
+# and buffer (see LeaderboardService.reconcile); KEYS[6..] are the leaderboard sorted sets.
+_RECORD_SOLVE = cache.register_script("""
+if redis.call('SADD', KEYS[1], ARGV[1]) == 1 then
+    redis.call('HINCRBY', KEYS[2], 'problem_solved_total', 1)
+    if ARGV[2] ~= '' then
+        redis.call('HINCRBY', KEYS[2], 'problem_solved_' .. ARGV[2], 1)
+    end
+    redis.call('DEL', KEYS[3])
+    local boards = {}
+    for i = 6, #KEYS do
+        redis.call('ZINCRBY', KEYS[i], 1, ARGV[3])
+        boards[#boards + 1] = KEYS[i]
+    end
+    if redis.call('EXISTS', KEYS[4]) == 1 then
+        -- A rebuild is about to replace these boards: keep the solve for replay
+        redis.call('RPUSH', KEYS[5], cjson.encode({ARGV[3], ARGV[1], boards}))
+    end
+    return 1
+end
+return 0
+""")
+
+class StatsService:
+    """
+    Incremental submission statistics kept in Redis, updated as verdicts land.
+    Reads never aggregate the submissions table.
+    """
+    @staticmethod
+    def record_verdict(pipe, user_id: int, problem_id: int, difficulty: str, tags: List[str], accepted: bool):
+        """Queues the counter updates for one applied verdict on an existing pipeline."""
+        stats_key = f"{PROBLEM_STATS_KEY}{problem_id}"
+        pipe.hincrby(stats_key, "attempts", 1)
+        if accepted:
+            pipe.hincrby(stats_key, "accepted", 1)
+            pipe.pfadd(f"{PROBLEM_SOLVERS_KEY}{problem_id}", user_id)
+            level = (difficulty or "").lower()
+            level = level if level in ("easy", "medium", "hard") else ""
+            _RECORD_SOLVE(
+                keys=[f"{USER_SOLVED_KEY}{user_id}", f"{USER_STATS_KEY}{user_id}", f"{USER_PROFILE_KEY}{user_id}",
+                      RECONCILE_ACTIVE_KEY, RECONCILE_BUFFER_KEY]
+                + LeaderboardService.board_keys_for(level, tags),
+                args=[problem_id, level, user_id],
+                client=pipe
+            )
+
+    @staticmethod
+    @metrics.timed
+    def attach_problem_stats(problems: List[dict]) -> List[dict]:
+        """Returns copies of the summaries with attempts/accepted/acceptanceRate/solvedBy filled in."""
+        if not problems:
+            return problems
+
+        pipe = cache.pipeline()
+        for p in problems:
+            pipe.hmget(f"{PROBLEM_STATS_KEY}{p['id']}", "attempts", "accepted")
+            pipe.pfcount(f"{PROBLEM_SOLVERS_KEY}{p['id']}")
+        results = pipe.execute()
+
+        enriched = []
+        for i, p in enumerate(problems):
+            attempts, accepted = (int(x or 0) for x in results[2 * i])
+            enriched.append({
+                **p,
+                "attempts": attempts,
+                "accepted": accepted,
+                "acceptanceRate": round(accepted / attempts, 4) if attempts else 0.0,
+                "solvedBy": int(results[2 * i + 1] or 0)
+            })
+        return enriched
+
+    @staticmethod
+    def listing_with_stats(problems: List[dict]) -> List[dict]:
+        """attach_problem_stats for the full catalog, reused for LISTING_STATS_TTL."""
+        listing = LocalCache.get(LISTING_STATS_KEY)
+        if listing is None:
+            listing = StatsService.attach_problem_stats(problems)
+            LocalCache.set(LISTING_STATS_KEY, listing, ttl=LISTING_STATS_TTL)
+        return listing
+
+    @staticmethod
+    def get_user_stats(user_id: int) -> dict:
+        stats = cache.r.hgetall(f"{USER_STATS_KEY}{user_id}")
+        return {
+            "problem_solved_easy": int(stats.get("problem_solved_easy", 0)),
+            "problem_solved_medium": int(stats.get("problem_solved_medium", 0)),
+            "problem_solved_hard": int(stats.get("problem_solved_hard", 0)),
+            "problem_solved_total": int(stats.get("problem_solved_total", 0)),
+        }
@@ -1,23 +1,86 @@
 import asyncio
+import hashlib
+import json
+import os
 import uuid
 from datetime import datetime
+from typing import Optional
 from app.models.problem import Submission, SubmissionStatus
-from app.core import cache, sqs
+from app.core import cache, metrics, sqs
+from app.core.notifier import SubmissionNotifier
 
 from app.schemas.problem_schema import ProblemDTO, TestCaseDTO
 from app.models.problem import Problem,TestCase
 
 from app.services.cache_service import CacheService
+from app.services.stats_service import StatsService
+
+IDEMPOTENCY_KEY_PREFIX = "idem:submit:"
+IDEMPOTENCY_WINDOW_SECONDS = 600
+IDEMPOTENCY_PENDING = "pending:"  # value prefix until the first request has committed
+VERDICT_KEY_PREFIX = "verdict:"
+VERDICT_PENDING_PREFIX = "verdict:pending:"
+# 0 disables the verdict cache
+VERDICT_CACHE_SECONDS = int(os.getenv("VERDICT_CACHE_SECONDS", 86400))
+
+class SubmissionInProgress(Exception):
+    """An earlier request with the same Idempotency-Key has not committed yet."""
+
+def normalize_code(code: str) -> str:
+    """Strips whitespace differences that cannot change a verdict."""
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return "\n".join(lines).strip("\n")
+
+def verdict_cache_key(problem_id: int, language: str, code: str) -> str:
+    # A problem's test set never changes under its id: there is no test-case
+    # update path, and deleted problem ids are never reused
+    code_hash = hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest()
+    return f"{VERDICT_KEY_PREFIX}{problem_id}:{language.lower()}:{code_hash}"
 
 class SubmissionService:
     def __init__(self, db):
         self.db = db
 
-    async def submit_code(self, data, user_id):
+    @metrics.timed
+    async def submit_code(self, data, user_id, idempotency_key: Optional[str] = None):
         sub_id = str(uuid.uuid4())
-        
-        # 1. Update Redis
+
+        # 0. Retries with the same Idempotency-Key get the original submission back,
+        # but only once it exists: while the first request is still running the
+        # retry gets SubmissionInProgress (409) instead of an id with no row yet
+        idem_key = f"{IDEMPOTENCY_KEY_PREFIX}{user_id}:{idempotency_key}" if idempotency_key else None
+        if idem_key and not cache.r.set(idem_key, f"{IDEMPOTENCY_PENDING}{sub_id}", nx=True, ex=IDEMPOTENCY_WINDOW_SECONDS):
+            existing = cache.get_cache(idem_key)
+            if existing and existing.startswith(IDEMPOTENCY_PENDING):
+                raise SubmissionInProgress()
+            if existing:
+                return existing
+            # Released by a failed first attempt between SET and GET: claim it now
+            if not cache.r.set(idem_key, f"{IDEMPOTENCY_PENDING}{sub_id}", nx=True, ex=IDEMPOTENCY_WINDOW_SECONDS):
+                raise SubmissionInProgress()
+
+        try:
+            result = self._submit(sub_id, data, user_id)
+        except Exception:
+            # Release the key so the client's retry is not pinned to a submission that never existed
+            if idem_key:
+                cache.delete_cache(idem_key)
+            raise
+        if idem_key:
+            cache.r.set(idem_key, result, ex=IDEMPOTENCY_WINDOW_SECONDS)
+        return result
+
+    def _submit(self, sub_id: str, data, user_id: int) -> str:
+        # 0b. Identical code against an unchanged test set: reuse the earlier verdict
+        verdict_key = verdict_cache_key(data.problemId, data.language, data.code) if VERDICT_CACHE_SECONDS else None
+        cached_verdict = cache.get_cache(verdict_key, is_json=True) if verdict_key else None
+        if cached_verdict:
+            return self._submit_cached_verdict(sub_id, data, user_id, cached_verdict)
+
+        # 1. Update Redis (and remember where to cache the verdict once the judge reports it)
         cache.set_cache(sub_id, SubmissionStatus.IN_PROGRESS.value)
+        if verdict_key:
+            cache.set_cache(f"{VERDICT_PENDING_PREFIX}{sub_id}", verdict_key, expiry=3600)
         
         # 2. Save to DB
         new_sub = Submission(
@@ -39,6 +102,36 @@ class SubmissionService:
             "language": data.language,
             "problemId": data.problemId
         })
+
+        return sub_id
+
+    def _submit_cached_verdict(self, sub_id: str, data, user_id: int, verdict: dict) -> str:
+        status = SubmissionStatus(verdict["status"])
+        new_sub = Submission(
+            submission_id=sub_id,
+            user_id=user_id,
+            problem_id=data.problemId,
+            code=data.code,
+            language=data.language,
+            status=status,
+            result=verdict.get("result"),
+            total_tests=verdict.get("totalTests"),
+            passed_tests=verdict.get("passedTests"),
+            time_taken_ms=verdict.get("timeTakenMs"),
+            memory_used=verdict.get("memoryUsed")
+        )
+        self.db.add(new_sub)
+        self.db.commit()
+
+        problem = self.db.query(Problem.difficulty, Problem.tags).filter(Problem.id == data.problemId).first()
+        pipe = cache.pipeline()
+        pipe.setex(sub_id, 600, status.value)
+        StatsService.record_verdict(
+            pipe, user_id, data.problemId,
+            problem.difficulty if problem else None, problem.tags if problem else None,
+            accepted=(status == SubmissionStatus.PASSED)
+        )
+        pipe.execute()
         return sub_id
 
     async def long_poll_submission(self, sub_id: str):
@@ -49,7 +142,8 @@ class SubmissionService:
             status = cache.get_cache(sub_id)
             if status != SubmissionStatus.IN_PROGRESS.value:
                 break
-            await asyncio.sleep(1)
+            # Returns early when the verdict consumer applies this submission
+            await SubmissionNotifier.wait(sub_id, timeout=1)
             waited += 1
             
         submission = self.db.query(Submission).filter(Submission.submission_id == sub_id).first()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core import cache, metrics, sqs
+from app.core.notifier import SubmissionNotifier
+from app.database import SessionLocal
+from app.models.problem import SubmissionStatus
+from app.schemas.problem_schema import VerdictDTO
+from app.services.stats_service import StatsService
+from app.services.submission_service import VERDICT_PENDING_PREFIX, VERDICT_CACHE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class VerdictService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    @metrics.timed
+    def apply_verdicts(self, verdicts: List[VerdictDTO]) -> int:
+        """
+        Writes a batch of judge verdicts back with one UPDATE ... FROM (VALUES ...).
+        Only rows still IN_PROGRESS are touched, so redelivered messages are no-ops.
+        Returns the number of submissions updated.
+        """
+        # Last verdict wins if the batch carries duplicates
+        verdicts = list({v.submissionId: v for v in verdicts}.values())
+        if not verdicts:
+            return 0
+
+        rows = []
+        params = {}
+        for i, v in enumerate(verdicts):
+            rows.append(
+                f"(:sid{i}, :status{i}, :result{i}, CAST(:total{i} AS INTEGER), "
+                f"CAST(:passed{i} AS INTEGER), CAST(:time{i} AS BIGINT), :memory{i})"
+            )
+            params.update({
+                f"sid{i}": v.submissionId,
+                f"status{i}": v.status.value,
+                f"result{i}": v.result,
+                f"total{i}": v.totalTests,
+                f"passed{i}": v.passedTests,
+                f"time{i}": v.timeTakenMs,
+                f"memory{i}": v.memoryUsed,
+            })
+
+        query = text(f"""
+            UPDATE submissions AS s SET
+                status = CAST(v.status AS submissionstatus),
+                result = v.result,
+                total_tests = COALESCE(v.total_tests, s.total_tests),
+                passed_tests = v.passed_tests,
+                time_taken_ms = v.time_taken_ms,
+                memory_used = v.memory_used
+            FROM (VALUES {", ".join(rows)})
+                AS v(submission_id, status, result, total_tests, passed_tests, time_taken_ms, memory_used)
+            WHERE s.submission_id = v.submission_id
+            AND s.status = 'IN_PROGRESS'
+            RETURNING s.submission_id, s.user_id, s.problem_id, v.status,
+                (SELECT p.difficulty FROM problems p WHERE p.id = s.problem_id) AS difficulty,
+                (SELECT p.tags FROM problems p WHERE p.id = s.problem_id) AS tags
+        """)
+
+        try:
+            updated = self.db.execute(query, params).fetchall()
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error applying verdicts: {e}")
+            raise e
+
+        # Verdict cache slots registered at submit time (see SubmissionService)
+        by_id = {v.submissionId: v for v in verdicts}
+        verdict_keys = cache.r.mget([f"{VERDICT_PENDING_PREFIX}{r.submission_id}" for r in updated]) if updated else []
+
+        # Statuses, statistics and cached verdicts go out in one Redis round-trip
+        pipe = cache.pipeline()
+        for r, verdict_key in zip(updated, verdict_keys):
+            pipe.setex(r.submission_id, 600, r.status)
+            if verdict_key:
+                verdict = by_id[r.submission_id].model_dump(mode="json", exclude={"submissionId"})
+                pipe.setex(verdict_key, VERDICT_CACHE_SECONDS, json.dumps(verdict))
+                pipe.delete(f"{VERDICT_PENDING_PREFIX}{r.submission_id}")
+            StatsService.record_verdict(
+                pipe, r.user_id, r.problem_id, r.difficulty, r.tags,
+                accepted=(r.status == SubmissionStatus.PASSED.value)
+            )
+        pipe.execute()
+
+        SubmissionNotifier.notify(r.submission_id for r in updated)
+        return len(updated)
+
+
+class VerdictConsumer:
+    """
+    Drains the judge result queue (SQS_RESULT_QUEUE) and applies verdicts in batches.
+    Messages are deleted only after the batch has been committed.
+    """
+    def __init__(self, queue_url: str, session_factory=SessionLocal, wait_seconds: int = 20):
+        self.queue_url = queue_url
+        self.session_factory = session_factory
+        self.wait_seconds = wait_seconds
+        self._stopped = False
+        self._task: Optional[asyncio.Task] = None
+
+    def poll_once(self) -> int:
+        messages = sqs.receive_from_queue(self.queue_url, max_messages=10, wait_seconds=self.wait_seconds)
+        if not messages:
+            return 0
+
+        verdicts = []
+        for m in messages:
+            try:
+                verdicts.append(VerdictDTO(**json.loads(m["Body"])))
+            except Exception as e:
+                # Malformed messages are dropped rather than redelivered forever
+                logger.error(f"Discarding malformed verdict message: {e}")
+
+        db = self.session_factory()
+        try:
+            count = VerdictService(db).apply_verdicts(verdicts)
+        finally:
+            db.close()
+
+        sqs.delete_from_queue(self.queue_url, messages)
+        return count
+
+    @staticmethod
+    def _in_daemon_thread(fn) -> asyncio.Future:
+        """
+        Like asyncio.to_thread, but on a daemon thread: the default executor is
+        joined at shutdown, which would hold the process for the rest of a
+        20s receive. An abandoned receive is harmless: undeleted messages are
+        redelivered and applying a verdict twice is a no-op.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(setter, value):
+            if not future.done():  # cancelled by stop()
+                setter(value)
+
+        def target():
+            try:
+                result = fn()
+            except Exception as e:
+                outcome = (future.set_exception, e)
+            else:
+                outcome = (future.set_result, result)
+            try:
+                loop.call_soon_threadsafe(settle, *outcome)
+            except RuntimeError:
+                pass  # loop already closed during shutdown
+
+        threading.Thread(target=target, name="verdict-consumer", daemon=True).start()
+        return future
+
+    async def run(self):
+        while not self._stopped:
+            try:
+                await self._in_daemon_thread(self.poll_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Verdict consumer error: {e}")
+                await asyncio.sleep(1)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        # Cancel rather than wait: the in-flight long poll may have up to wait_seconds left
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
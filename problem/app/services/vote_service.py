@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core import cache
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+EDITORIAL_VOTERS_KEY = "editorial:voters:"               # set of user ids per editorial
+EDITORIAL_UPVOTES_KEY = "editorial:upvotes"              # hash: editorial id -> live upvote count
+EDITORIAL_PENDING_KEY = "editorial:upvotes:pending"      # hash: editorial id -> delta not yet in Postgres
+EDITORIAL_FLUSHING_KEY = "editorial:upvotes:flushing"    # pending deltas taken by the running flush
+EDITORIAL_BATCH_KEY = "editorial:upvotes:flushing:batch" # id of the batch in EDITORIAL_FLUSHING_KEY
+FLUSH_LOCK_KEY = "editorial:upvotes:flush:lock"
+FLUSH_INTERVAL_SECONDS = int(os.getenv("VOTE_FLUSH_SECONDS", 30))
+FLUSH_BATCH_SIZE = 500
+APPLIED_BATCH_RETENTION_DAYS = 7
+
+# Records or removes one user's vote. The voter set makes it idempotent; the
+# live counter is seeded from the Postgres value (ARGV[4]) the first time.
+# KEYS: voters set, live counter hash, pending delta hash.
+# ARGV: user_id, editorial_id, direction (1 = vote, -1 = unvote), db_upvotes.
+# Returns {changed, live_count}.
+_VOTE = cache.register_script("""
+local changed
+if tonumber(ARGV[3]) > 0 then
+    changed = redis.call('SADD', KEYS[1], ARGV[1])
+else
+    changed = redis.call('SREM', KEYS[1], ARGV[1])
+end
+redis.call('HSETNX', KEYS[2], ARGV[2], ARGV[4])
+if changed == 1 then
+    redis.call('HINCRBY', KEYS[3], ARGV[2], ARGV[3])
+    return {1, redis.call('HINCRBY', KEYS[2], ARGV[2], ARGV[3])}
+end
+return {0, tonumber(redis.call('HGET', KEYS[2], ARGV[2]))}
+""")
+
+# Takes the pending deltas for a flush, or resumes the batch a failed flush left.
+# KEYS: pending hash, flushing hash, batch id key. ARGV: new batch id.
+# Returns the batch id, or nil when there is nothing to flush.
+_TAKE_BATCH = cache.register_script("""
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return nil
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('SET', KEYS[3], ARGV[1])
+elseif redis.call('EXISTS', KEYS[3]) == 0 then
+    redis.call('SET', KEYS[3], ARGV[1])
+end
+return redis.call('GET', KEYS[3])
+""")
+
+class VoteService:
+    """
+    Editorial upvotes live in Redis: votes never lock an editorials row.
+    Deltas accumulate in EDITORIAL_PENDING_KEY and flush() applies them to
+    Postgres in batched UPDATEs every FLUSH_INTERVAL_SECONDS.
+    """
+    @staticmethod
+    def vote(editorial_id: int, user_id: int, db_upvotes: int, upvote: bool = True) -> Tuple[bool, int]:
+        """Returns (changed, live upvote count); changed is False for a repeated vote/unvote."""
+        changed, count = _VOTE(
+            keys=[f"{EDITORIAL_VOTERS_KEY}{editorial_id}", EDITORIAL_UPVOTES_KEY, EDITORIAL_PENDING_KEY],
+            args=[user_id, editorial_id, 1 if upvote else -1, db_upvotes]
+        )
+        return bool(changed), int(count)
+
+    @staticmethod
+    def has_voted(editorial_id: int, user_id: int) -> bool:
+        return bool(cache.r.sismember(f"{EDITORIAL_VOTERS_KEY}{editorial_id}", user_id))
+
+    @staticmethod
+    def live_counts(editorial_ids: Iterable[int]) -> Dict[int, int]:
+        """Live counts for editorials that have been voted on; others keep their Postgres value."""
+        ids = list(editorial_ids)
+        if not ids:
+            return {}
+        try:
+            values = cache.r.hmget(EDITORIAL_UPVOTES_KEY, ids)
+        except Exception as e:
+            logger.error(f"Could not read live upvotes: {e}")
+            return {}
+        return {i: int(v) for i, v in zip(ids, values) if v is not None}
+
+    @staticmethod
+    def flush(db: Session) -> int:
+        """
+        Moves pending deltas aside under a batch id and adds them to
+        editorials.upvotes in one transaction that also records the id. On
+        failure the batch stays in EDITORIAL_FLUSHING_KEY and the next run
+        retries it; a batch that did commit (e.g. the process died before the
+        Redis cleanup) is recognised by its id and not applied again.
+        Returns the number of editorials updated.
+        """
+        batch_id = _TAKE_BATCH(
+            keys=[EDITORIAL_PENDING_KEY, EDITORIAL_FLUSHING_KEY, EDITORIAL_BATCH_KEY],
+            args=[uuid.uuid4().hex]
+        )
+        if batch_id is None:
+            return 0
+
+        deltas = [(int(k), int(v)) for k, v in cache.r.hgetall(EDITORIAL_FLUSHING_KEY).items() if int(v) != 0]
+        try:
+            claimed = db.execute(text("""
+                INSERT INTO vote_flush_batches (batch_id, applied_at) VALUES (:batch_id, NOW())
+                ON CONFLICT (batch_id) DO NOTHING
+            """), {"batch_id": batch_id}).rowcount
+            if claimed:
+                for start in range(0, len(deltas), FLUSH_BATCH_SIZE):
+                    batch = deltas[start:start + FLUSH_BATCH_SIZE]
+                    rows = ", ".join(f"(CAST(:id{i} AS BIGINT), CAST(:delta{i} AS INTEGER))" for i in range(len(batch)))
+                    params = {}
+                    for i, (editorial_id, delta) in enumerate(batch):
+                        params[f"id{i}"] = editorial_id
+                        params[f"delta{i}"] = delta
+                    db.execute(text(f"""
+                        UPDATE editorials AS e SET upvotes = COALESCE(e.upvotes, 0) + v.delta
+                        FROM (VALUES {rows}) AS v(id, delta)
+                        WHERE e.id = v.id
+                    """), params)
+                db.execute(text(
+                    f"DELETE FROM vote_flush_batches WHERE applied_at < NOW() - INTERVAL '{APPLIED_BATCH_RETENTION_DAYS} days'"
+                ))
+            else:
+                logger.warning(f"Upvote batch {batch_id} was already applied; discarding it")
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise e
+
+        cache.r.delete(EDITORIAL_FLUSHING_KEY, EDITORIAL_BATCH_KEY)
+        return len(deltas) if claimed else 0
+
+    @staticmethod
+    async def run_flusher(session_factory=SessionLocal):
+        """Flushes every FLUSH_INTERVAL_SECONDS; a Redis lock keeps each round to one worker."""
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                if not cache.r.set(FLUSH_LOCK_KEY, "1", nx=True, ex=max(60, FLUSH_INTERVAL_SECONDS * 4)):
+                    continue
+            except Exception as e:
+                logger.error(f"Upvote flusher cannot reach Redis: {e}")
+                continue
+
+            db = session_factory()
+            try:
+                count = await asyncio.to_thread(VoteService.flush, db)
+                if count:
+                    logger.info(f"Flushed upvote deltas for {count} editorials")
+            except Exception as e:
+                logger.error(f"Upvote flush failed: {e}")
+            finally:
+                db.close()
+                cache.r.delete(FLUSH_LOCK_KEY)
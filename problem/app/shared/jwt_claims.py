@@ -0,0 +1,95 @@
+# Vendored from shared/jwt_claims.py by shared/sync.py; edit it there, not here.
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+from jose import JWTError, jwt
+
+logger = logging.getLogger(__name__)
+
+# header.payload.signature, base64url segments; checked before any crypto work
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$")
+MAX_TOKEN_LENGTH = 4096
+
+class ClaimsCache:
+    """
+    Bounded LRU of verified JWT claims keyed by the token's SHA-256.
+    Entries are dropped at the token's own exp (capped at MAX_TTL), so a cache
+    hit is never more permissive than a fresh jwt.decode. Claims are copied in
+    and out: a caller mutating its dict cannot change what later requests see.
+    """
+    _storage: "OrderedDict[str, tuple]" = OrderedDict()
+    _lock = Lock()
+
+    MAX_SIZE = 10000
+    MAX_TTL = 3600
+
+    @classmethod
+    def get(cls, key: str) -> Optional[dict]:
+        with cls._lock:
+            entry = cls._storage.get(key)
+            if entry is None:
+                return None
+            claims, expiry = entry
+            if time.time() >= expiry:
+                del cls._storage[key]
+                return None
+            cls._storage.move_to_end(key)
+        return dict(claims)
+
+    @classmethod
+    def set(cls, key: str, claims: dict):
+        expiry = time.time() + cls.MAX_TTL
+        if isinstance(claims.get("exp"), (int, float)):
+            expiry = min(expiry, claims["exp"])
+        claims = dict(claims)
+        with cls._lock:
+            cls._storage[key] = (claims, expiry)
+            cls._storage.move_to_end(key)
+            while len(cls._storage) > cls.MAX_SIZE:
+                cls._storage.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._storage.clear()
+
+def decode_token(token: str, secret_key: str, algorithm: str) -> Optional[dict]:
+    """Verifies the token once and serves repeats from ClaimsCache. Returns None if invalid."""
+    token = (token or "").strip()
+    if len(token) > MAX_TOKEN_LENGTH or not TOKEN_PATTERN.match(token):
+        return None
+
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = ClaimsCache.get(key)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = jwt.decode(token, secret_key, algorithms=[algorithm])
+    except JWTError as e:
+        logger.info(f"JWT Decode Error: {str(e)}")
+        return None
+    ClaimsCache.set(key, claims)
+    return claims
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Returns the token from a well-formed 'Bearer <token>' header, else None."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme != "Bearer" or not token:
+        return None
+    return token
+
+def subject_id(claims: Optional[dict]) -> Optional[int]:
+    """The numeric user id in 'sub', or None if missing or not an integer."""
+    if not claims:
+        return None
+    try:
+        return int(claims.get("sub"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,136 @@
+# Vendored from shared/rate_limit.py by shared/sync.py; edit it there, not here.
+import logging
+import math
+import os
+import time
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+from fastapi import Depends, HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit:"
+# Proxies in front of the service that append to X-Forwarded-For (the gateway)
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 1))
+
+# Token buckets checked together and consumed all-or-nothing in one round-trip.
+# KEYS: bucket keys. ARGV: now_ms, then (capacity, refill_per_second, initial)
+# per key; initial seeds a bucket that does not exist yet ('' = full).
+# Returns "0" when allowed, otherwise the seconds until a token is available
+# (as a string: Lua numbers are truncated to integers on the way out).
+TOKEN_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local current = tonumber(bucket[1]) or tonumber(ARGV[i * 3 + 1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    current = math.min(capacity, current + math.max(0, now - ts) / 1000 * rate)
+    if current < 1 then
+        wait = math.max(wait, (1 - current) / rate)
+    end
+    tokens[i] = current
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 1])
+    local rate = tonumber(ARGV[i * 3])
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+return "0"
+"""
+
+Policy = Tuple[int, float]
+
+def policy(name: str, capacity: int, per_seconds: int) -> Policy:
+    """(capacity, refill_per_second), overridable with RATE_LIMIT_<NAME>=capacity/seconds."""
+    override = os.getenv(f"RATE_LIMIT_{name.upper()}")
+    if override:
+        capacity, per_seconds = (int(x) for x in override.split("/"))
+    return capacity, capacity / per_seconds
+
+def client_ip(request: Request) -> str:
+    """
+    The caller's address. Behind the gateway rewrite (and any load balancer)
+    request.client is the proxy, so X-Forwarded-For is read from the right:
+    each of our TRUSTED_PROXY_COUNT proxies appends the peer it saw, and
+    anything further left was sent by the client and cannot be trusted.
+    """
+    hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",")]
+    if TRUSTED_PROXY_COUNT and len(hops) >= TRUSTED_PROXY_COUNT and hops[-TRUSTED_PROXY_COUNT]:
+        return hops[-TRUSTED_PROXY_COUNT]
+    return request.client.host if request.client else "unknown"
+
+class RateLimiterUnavailable(Exception):
+    """Redis could not be reached for a route that fails closed."""
+
+class TokenBucketLimiter:
+    """
+    Per-subject plus per-route global token buckets (route -> (subject policy,
+    global policy)), evaluated atomically by TOKEN_BUCKET_LUA. `script` is the
+    service's registered copy of that script, sync or asyncio. Routes in
+    fail_closed raise RateLimiterUnavailable when Redis is down; the rest allow.
+    """
+    def __init__(self, script: Callable, policies: Dict[str, Tuple[Policy, Policy]], fail_closed: Collection[str] = ()):
+        self.script = script
+        self.policies = policies
+        self.fail_closed = set(fail_closed)
+
+    def _call(self, route: str, subject: str, initial: Optional[float]) -> Tuple[List[str], List]:
+        user_policy, global_policy = self.policies[route]
+        keys = [self.bucket_key(route, subject), self.bucket_key(route, "global")]
+        args: List = [int(time.time() * 1000), *user_policy, "" if initial is None else initial, *global_policy, ""]
+        return keys, args
+
+    @staticmethod
+    def bucket_key(route: str, subject: str) -> str:
+        return f"{RATE_LIMIT_KEY_PREFIX}{route}:{subject}"
+
+    def _unavailable(self, route: str, e: Exception) -> float:
+        if route in self.fail_closed:
+            logger.error(f"Rate limiter unavailable, refusing {route}: {e}")
+            raise RateLimiterUnavailable(route) from e
+        logger.error(f"Rate limiter unavailable, allowing {route}: {e}")
+        return 0.0
+
+    def consume(self, route: str, subject: str, initial: Optional[float] = None) -> float:
+        """
+        Takes one token from the subject's bucket and the route's global bucket.
+        Returns 0 if allowed, otherwise seconds to wait. `initial` seeds a new
+        subject bucket (e.g. quota carried over from elsewhere).
+        """
+        keys, args = self._call(route, subject, initial)
+        try:
+            return float(self.script(keys=keys, args=args))
+        except Exception as e:
+            return self._unavailable(route, e)
+
+    async def consume_async(self, route: str, subject: str, initial: Optional[float] = None) -> float:
+        """consume() for an asyncio Redis script."""
+        keys, args = self._call(route, subject, initial)
+        try:
+            return float(await self.script(keys=keys, args=args))
+        except Exception as e:
+            return self._unavailable(route, e)
+
+def rate_limit_dependency(limiter: TokenBucketLimiter, route: str, user_id_dependency: Callable, detail: str):
+    """FastAPI dependency enforcing limiter's policy for route; keyed by user id, else client IP."""
+    def dependency(request: Request, user_id=Depends(user_id_dependency)):
+        # Shares the route's per-request token verification
+        subject = f"user:{user_id}" if user_id is not None else f"ip:{client_ip(request)}"
+        try:
+            retry_after = limiter.consume(route, subject)
+        except RateLimiterUnavailable:
+            raise HTTPException(status_code=503, detail="Service temporarily unavailable", headers={"Retry-After": "1"})
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=detail,
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+    return dependency
@@ -0,0 +1,63 @@
+"""
+Multi-worker profile: `gunicorn -c gunicorn.conf.py app.main:app`.
+
+WEB_CONCURRENCY sets the worker count (default: one per CPU this container
+may actually use, capped at MAX_DEFAULT_WORKERS). Workers share
+the count/tags/catalog snapshots through app.core.shared_cache and Prometheus
+metrics through PROMETHEUS_MULTIPROC_DIR, so /metrics aggregates every worker.
+Single-process `uvicorn app.main:app` keeps working unchanged.
+"""
+import math
+import os
+import shutil
+import tempfile
+import uuid
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8082')}"
+MAX_DEFAULT_WORKERS = 8
+
+def available_cpus() -> int:
+    """
+    CPUs this process may run on, lowered by a cgroup CPU quota. cpu_count()
+    reports the host's cores, which in a container can be many times the quota.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    for quota_file, period_file in (
+        ("/sys/fs/cgroup/cpu.max", None),                           # cgroup v2: "<quota> <period>"
+        ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us"),  # v1
+    ):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+        except (OSError, IndexError):
+            continue
+        if quota not in ("max", "-1"):
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+        break
+    return cpus
+
+workers = int(os.getenv("WEB_CONCURRENCY", min(available_cpus(), MAX_DEFAULT_WORKERS)))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))  # long-polls hold requests for up to a minute
+graceful_timeout = 30
+keepalive = 5
+
+# Must be set before workers import prometheus_client
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "codear-prometheus"))
+
+def on_starting(server):
+    # Shared by this start's workers (forked after this), new on every restart:
+    # scopes the once-per-start cache warm-up in cache_warmup_service
+    os.environ["SERVER_BOOT_ID"] = uuid.uuid4().hex
+    # Stale files from a previous run would be summed into the new totals
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
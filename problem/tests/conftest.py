@@ -0,0 +1,15 @@
+"""
+Unit tests for pure helpers; no Postgres or Redis needed.
+
+    cd problem && python -m pytest -q tests
+"""
+import os
+import sys
+
+# app.database builds its (lazy) engine at import time from these
+for name, value in {
+    "DB_USER": "test", "PASSWORD": "test", "DB_HOST": "127.0.0.1", "DB_PORT": "5432", "DB_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
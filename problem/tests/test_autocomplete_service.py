@@ -0,0 +1,53 @@
+import pytest
+from app.services.autocomplete_service import AutocompleteService
+from app.services.problem_service import ProblemService
+
+CATALOG = [
+    {"id": 1, "title": "Two Sum", "difficulty": "Easy"},
+    {"id": 2, "title": "Sum of Subarray Minimums", "difficulty": "Medium"},
+    {"id": 3, "title": "Binary Search", "difficulty": "Easy"},
+    {"id": 4, "title": "Search in Rotated Array", "difficulty": "Medium"},
+]
+
+@pytest.fixture
+def catalog(monkeypatch):
+    current = list(CATALOG)
+    monkeypatch.setattr(ProblemService, "get_all_problems", lambda self: current)
+    monkeypatch.setattr(AutocompleteService, "_index", (None, None, (), ()))
+    return current
+
+def ids(suggestions):
+    return [s["id"] for s in suggestions]
+
+def test_title_start_matches_rank_before_mid_title(catalog):
+    assert ids(AutocompleteService.suggest(None, "sum")) == [2, 1]
+    assert ids(AutocompleteService.suggest(None, "search")) == [4, 3]
+
+def test_prefix_is_case_and_space_insensitive(catalog):
+    assert ids(AutocompleteService.suggest(None, "  BINARY   se")) == [3]
+
+def test_blank_and_unknown_prefixes(catalog):
+    assert AutocompleteService.suggest(None, "   ") == []
+    assert AutocompleteService.suggest(None, "zzz") == []
+
+def test_limit_and_one_entry_per_problem(catalog):
+    assert len(AutocompleteService.suggest(None, "s", limit=1)) == 1
+    assert sorted(ids(AutocompleteService.suggest(None, "s"))) == [1, 2, 3, 4]
+
+def test_suggestion_shape(catalog):
+    assert AutocompleteService.suggest(None, "two") == [{"id": 1, "title": "Two Sum", "difficulty": "Easy"}]
+
+def test_rebuilds_when_catalog_snapshot_changes(catalog, monkeypatch):
+    assert AutocompleteService.suggest(None, "graph") == []
+    replaced = CATALOG + [{"id": 5, "title": "Graph Paths", "difficulty": "Hard"}]
+    monkeypatch.setattr(ProblemService, "get_all_problems", lambda self: replaced)
+    assert ids(AutocompleteService.suggest(None, "graph")) == [5]
+    assert AutocompleteService._index[0] is replaced
+
+def test_equal_catalog_reuses_index(catalog, monkeypatch):
+    AutocompleteService.suggest(None, "two")
+    keys = AutocompleteService._index[2]
+    # A fresh list with the same titles, as a Redis reload returns
+    monkeypatch.setattr(ProblemService, "get_all_problems", lambda self: [dict(p) for p in CATALOG])
+    assert ids(AutocompleteService.suggest(None, "two")) == [1]
+    assert AutocompleteService._index[2] is keys
@@ -0,0 +1,42 @@
+from app.core import http_cache
+from app.core.http_cache import content_etag, matches_version, negotiate_encoding, not_modified
+
+def test_negotiate_prefers_brotli_when_available(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", object())
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+
+def test_negotiate_falls_back_to_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+    assert negotiate_encoding("gzip, br") == "gzip"
+
+def test_negotiate_respects_q_zero(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", object())
+    assert negotiate_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert negotiate_encoding("gzip;q=bogus") is None
+
+def test_negotiate_identity_only():
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("identity") is None
+
+def test_not_modified_matches_weak_and_strong_forms():
+    etag = content_etag(b"body")
+    assert etag.startswith('W/"')
+    assert not_modified({b"if-none-match": etag.encode()}, etag)
+    assert not_modified({b"if-none-match": etag[2:].encode()}, etag)
+    assert not_modified({b"if-none-match": f'"other", {etag}'.encode()}, etag)
+    assert not_modified({b"if-none-match": b"*"}, etag)
+
+def test_not_modified_rejects_other_tags_and_missing_header():
+    etag = content_etag(b"body")
+    assert not not_modified({b"if-none-match": content_etag(b"changed").encode()}, etag)
+    assert not not_modified({}, etag)
+    assert not not_modified({b"if-modified-since": b"Tue, 01 Jan 2030 00:00:00 GMT"}, etag)
+
+def test_matches_version_only_for_the_served_version():
+    body = b'{"id": 1, "version": "abc123"}'
+    assert matches_version(body, b"v=abc123")
+    assert not matches_version(body, b"v=stale")
+    assert not matches_version(body, b"")
+    assert not matches_version(b'{"id": 1}', b"v=abc123")
+    assert not matches_version(b"not json", b"v=abc123")
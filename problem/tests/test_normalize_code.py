@@ -0,0 +1,14 @@
+from app.services.submission_service import normalize_code, verdict_cache_key
+
+def test_line_endings_and_trailing_whitespace_are_ignored():
+    assert normalize_code("int main() {  \r\n  return 0;\t\r\n}\r\n\r\n") == "int main() {\n  return 0;\n}"
+    assert normalize_code("a\rb") == "a\nb"
+
+def test_leading_indentation_and_inner_blank_lines_are_kept():
+    assert normalize_code("if x:\n    y()\n\n    z()") == "if x:\n    y()\n\n    z()"
+    assert normalize_code("\n\n  x = 1\n") == "  x = 1"
+
+def test_verdict_key_follows_normalized_code():
+    assert verdict_cache_key(1, "Python", "x = 1  \r\n") == verdict_cache_key(1, "python", "x = 1")
+    assert verdict_cache_key(1, "python", "x = 1") != verdict_cache_key(1, "python", "x = 2")
+    assert verdict_cache_key(1, "python", "x = 1") != verdict_cache_key(2, "python", "x = 1")
@@ -0,0 +1,25 @@
+from app.core.search_keys import normalize, search_key
+
+def test_normalize_canonicalizes_words_difficulty_and_tags():
+    assert normalize("  Two SUM two ", " Easy ", ["dp", " array", "dp", ""]) == ("sum two", "easy", ["array", "dp"])
+
+def test_normalize_turns_empty_values_into_none():
+    assert normalize("   ", "", []) == (None, None, None)
+    assert normalize(None, None, None) == (None, None, None)
+
+def test_normalize_keeps_tag_case():
+    assert normalize(None, None, ["DP", "dp"]) == (None, None, ["DP", "dp"])
+
+def test_search_key_is_prefixed_fixed_length_and_deterministic():
+    key = search_key("Search_problem", "two sum", None, ["dp"], 0, 10)
+    prefix, _, digest = key.partition(":")
+    assert prefix == "Search_problem"
+    assert len(digest) == 32
+    assert key == search_key("Search_problem", "two sum", None, ["dp"], 0, 10)
+
+def test_search_key_separates_different_queries():
+    assert search_key("p", "a", None, None, 0, 10) != search_key("p", "a", None, None, 1, 10)
+    assert search_key("p", "a b", None) != search_key("p", "a", "b")
+
+def test_equivalent_queries_share_a_key():
+    assert search_key("p", *normalize("Sum TWO", "EASY", ["b", "a"])) == search_key("p", *normalize("two sum", "easy", ["a", "b"]))
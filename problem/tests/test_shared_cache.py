@@ -0,0 +1,48 @@
+import os
+import time
+import pytest
+from app.core.shared_cache import SharedCache
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    monkeypatch.setattr(SharedCache, "DIRECTORY", str(tmp_path / "l1"))
+    monkeypatch.setattr(SharedCache, "_parsed", {})
+    return SharedCache
+
+def test_set_get_round_trip(shared):
+    assert shared.get("problem_count") is None
+    shared.set("problem_count", 42)
+    shared.set("all_tags", ["dp", "graph"])
+    assert shared.get("problem_count") == 42
+    assert shared.get("all_tags") == ["dp", "graph"]
+
+def test_replaced_snapshot_is_reparsed(shared):
+    shared.set("all_tags", ["dp"])
+    assert shared.get("all_tags") == ["dp"]
+    # set() never touches the parsed copies, exactly like a write from another worker
+    shared.set("all_tags", ["dp", "math"])
+    assert shared.get("all_tags") == ["dp", "math"]
+
+def test_delete_and_expiry(shared, monkeypatch):
+    shared.set("k", "v")
+    shared.delete("k")
+    shared.delete("k")  # idempotent
+    assert shared.get("k") is None
+
+    shared.set("ttl", "v", ttl=10)
+    assert shared.get("ttl") == "v"
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 11)
+    assert shared.get("ttl") is None
+
+def test_names_are_sanitized_and_no_temp_files_remain(shared):
+    shared.set("../escape/name", 1)
+    assert shared.get("../escape/name") == 1
+    assert os.listdir(shared.DIRECTORY) == [".._escape_name"]
+
+def test_unwritable_directory_only_costs_the_cache(shared, tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(SharedCache, "DIRECTORY", str(blocker / "l1"))
+    shared.set("k", 1)
+    assert shared.get("k") is None
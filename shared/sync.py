@@ -0,0 +1,65 @@
+"""
+Vendors the modules in shared/ into each service as app/shared/<module>.py.
+
+    python shared/sync.py           # rewrite the vendored copies
+    python shared/sync.py --check   # exit 1 if any copy has drifted (run by ci.sh)
+
+Each service is built and deployed from its own directory (Docker context,
+Vercel root), so code both services need cannot be imported from here at
+runtime. This file is the only way those copies get written: edit the module
+in shared/, run this script and commit both.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARED_DIR = os.path.join(ROOT, "shared")
+SERVICES = ["problem", "user"]
+HEADER = "# Vendored from shared/{name} by shared/sync.py; edit it there, not here.\n"
+
+def modules():
+    return sorted(
+        name for name in os.listdir(SHARED_DIR)
+        if name.endswith(".py") and name != os.path.basename(__file__)
+    )
+
+def vendored(name: str) -> str:
+    with open(os.path.join(SHARED_DIR, name)) as f:
+        return HEADER.format(name=name) + f.read()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    drifted = []
+    for service in SERVICES:
+        target_dir = os.path.join(ROOT, service, "app", "shared")
+        expected = {name: vendored(name) for name in modules()}
+        present = set(os.listdir(target_dir)) if os.path.isdir(target_dir) else set()
+        stale = {name for name in present if name.endswith(".py")} - set(expected)
+
+        for name, content in expected.items():
+            path = os.path.join(target_dir, name)
+            current = open(path).read() if os.path.exists(path) else None
+            if current == content:
+                continue
+            drifted.append(os.path.relpath(path, ROOT))
+            if not args.check:
+                os.makedirs(target_dir, exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(content)
+        for name in stale:
+            drifted.append(os.path.relpath(os.path.join(target_dir, name), ROOT))
+            if not args.check:
+                os.remove(os.path.join(target_dir, name))
+
+    if args.check and drifted:
+        print("Out of sync with shared/ (run python shared/sync.py):\n  " + "\n  ".join(drifted))
+        sys.exit(1)
+    for path in drifted:
+        print(f"updated {path}")
+
+if __name__ == "__main__":
+    main()
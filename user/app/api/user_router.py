@@ -1,22 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.schemas.user_schema import RegisterDTO, LoginDTO, ChatRequest
+from app.schemas.user_schema import RegisterDTO, LoginDTO, ChatRequest, UserProfileDTO
 from app.services.user_service import UserService
 from app.services.ai_service import AiService
+from app.services.response_cache_service import ResponseCache
 from app.core import security
+from app.services.rate_limiter_service import RateLimiterService
 
 router = APIRouter(prefix="/api/v1/user")
 
-@router.post("/register")
-def register(data: RegisterDTO, db: Session = Depends(get_db)):
+@router.post("/register", response_model=UserProfileDTO)
+async def register(data: RegisterDTO, db: AsyncSession = Depends(get_db)):
     service = UserService(db)
-    return service.register_user(data)
+    return await service.register_user(data)
 
 @router.post("/login")
-def login(data: LoginDTO, db: Session = Depends(get_db)):
+async def login(data: LoginDTO, db: AsyncSession = Depends(get_db)):
     service = UserService(db)
-    token = service.login_user(data)
+    token = await service.login_user(data)
     if not token:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {"token": token}
@@ -24,21 +27,40 @@ def login(data: LoginDTO, db: Session = Depends(get_db)):
 @router.post("/chat")
 async def chat(
     request: ChatRequest, 
-    authorization: str = Header(None), 
-    db: Session = Depends(get_db)
+    user_id: int = Depends(security.get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    token = authorization.split(" ")[1]
-    user_id = security.extract_user_id(token)
-    
-    user_service = UserService(db)
-    user = user_service.get_user_by_id(user_id)
+    # Cached profile read only confirms the user exists; the chat quota lives in Redis
+    if await UserService(db).get_profile_json(user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Over quota is still a 200 whose reply explains the limit, as clients expect
+    limited_reply = await RateLimiterService.check_chat_quota(db, user_id)
+    if limited_reply is not None:
+        if request.stream:
+            return StreamingResponse(
+                AiService._replay(limited_reply),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        return {"reply": limited_reply}
     
     ai_service = AiService(db)
+    if request.stream:
+        return StreamingResponse(
+            await ai_service.stream_ai_response(
+                user_id,
+                request.problemStatement,
+                request.code,
+                request.userMessage,
+                request.problemId
+            ),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
     reply = await ai_service.get_ai_response(
-        user, 
+        user_id, 
         request.problemStatement, 
         request.code, 
         request.userMessage,
@@ -46,44 +68,29 @@ async def chat(
     )
     return {"reply": reply}
 
+@router.get("/chat/cache-stats")
+def get_chat_cache_stats():
+    return ResponseCache.get_stats()
+
 @router.get("/chat/history/{problemId}")
 async def get_chat_history(
     problemId: str,
-    authorization: str = Header(None),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(security.get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    token = authorization.split(" ")[1]
-    user_id = security.extract_user_id(token)
-    
     ai_service = AiService(db)
     history = await ai_service.get_chat_history(user_id, problemId)
     return history
 
 @router.get("/user")
-def get_user(
-    authorization: str = Header(None), 
-    db: Session = Depends(get_db)
+async def get_user(
+    user_id: int = Depends(security.get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    # Check for header
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
-    
-    # Extract token (remove "Bearer " prefix)
-    token = authorization.split(" ")[1]
-    
-    # Decode token to get user_id
-    user_id = security.extract_user_id(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    # Get user from database
-    service = UserService(db)
-    user = service.get_user_by_id(int(user_id))
+    # Pre-serialized public profile: no ORM load or re-encoding on a cache hit
+    profile = await UserService(db).get_profile_json(user_id)
     
-    if not user:
+    if profile is None:
         raise HTTPException(status_code=404, detail="User not found")
         
-    return user
\ No newline at end of file
+    return Response(content=profile, media_type="application/json")
\ No newline at end of file
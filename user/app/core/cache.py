@@ -0,0 +1,68 @@
+import json
+import os
+from threading import Lock
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same Redis instance as the problem service, which owns the "user:stats:" counters
+# REDIS_SSL=false only for local benchmark stacks
+redis_scheme = "rediss" if os.getenv('REDIS_SSL', 'true').lower() == 'true' else "redis"
+
+# Built on first use rather than at import, so serverless cold starts do not pay for it.
+# redis.asyncio: every call is awaited, so handlers never block the event loop on Redis.
+_client = None
+_client_lock = Lock()
+
+def get_redis():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import redis.asyncio as redis
+                _client = redis.from_url(
+                    f"{redis_scheme}://default:{os.getenv('REDIS_PASSWORD')}@{os.getenv('REDIS_HOST')}:{os.getenv('REDIS_PORT')}",
+                    decode_responses=True
+                )
+    return _client
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def __getattr__(name):
+    # Keeps `cache.r` working for callers while construction stays lazy
+    if name == "r":
+        return get_redis()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazyScript:
+    """register_script() that defers client construction to the first call. Calls return an awaitable."""
+    def __init__(self, source: str):
+        self.source = source
+        self._script = None
+
+    def __call__(self, keys=[], args=[], client=None):
+        if self._script is None:
+            self._script = get_redis().register_script(self.source)
+        return self._script(keys=keys, args=args, client=client)
+
+def register_script(source: str) -> LazyScript:
+    return LazyScript(source)
+
+async def set_cache(key, value, expiry=600):
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    await get_redis().setex(key, expiry, str(value))
+
+async def get_cache(key, is_json=False):
+    data = await get_redis().get(key)
+    if data and is_json:
+        return json.loads(data)
+    return data
+
+async def delete_cache(key):
+    await get_redis().delete(key)
@@ -0,0 +1,25 @@
+import os
+import httpx
+from typing import Optional
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide pooled client: connections (and their TLS sessions) are kept
+    alive and reused across requests instead of being rebuilt per call.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=os.getenv("HTTP2_ENABLED", "true").lower() == "true",
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+    return _client
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# PASSWORD_POOL_WORKERS=0 hashes on a thread instead (e.g. serverless runtimes
+# without multiprocessing) while still applying the MAX_PENDING admission limit.
+# Changing BCRYPT_ROUNDS makes every existing hash "need update", so users are
+# transparently rehashed at the new cost on their next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", max(1, POOL_WORKERS) * 8))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# --- Worker-side functions (must be module level to be picklable) ---
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordPool:
+    """
+    Runs bcrypt in a dedicated, size-limited process pool so a login burst
+    never occupies the event loop or the request threadpool. Admission is capped at MAX_PENDING
+    jobs; beyond that callers get an immediate 503 instead of queueing.
+    """
+    _executor: Optional[ProcessPoolExecutor] = None
+    _pending = 0
+    _lock = Lock()
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return cls._executor
+
+    @classmethod
+    async def _run(cls, fn, *args):
+        with cls._lock:
+            if cls._pending >= MAX_PENDING:
+                logger.warning(f"Password pool saturated ({cls._pending} pending), rejecting request")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Server busy, please retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            cls._pending += 1
+            executor = cls._get_executor() if POOL_WORKERS > 0 else None
+        try:
+            if executor is None:
+                return await asyncio.to_thread(fn, *args)
+            # Awaited, never .result(): blocking here would stall the event loop for the whole hash
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        finally:
+            with cls._lock:
+                cls._pending -= 1
+
+    @classmethod
+    async def hash_password(cls, password: str) -> str:
+        return await cls._run(_hash, password)
+
+    @classmethod
+    async def verify_password(cls, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Returns (is_valid, new_hash); new_hash is set when the stored hash needs a rehash."""
+        return await cls._run(_verify_and_update, password, hashed)
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False)
+                cls._executor = None
@@ -1,17 +1,31 @@
 import os
+import logging
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Optional
+from fastapi import Depends, Header, HTTPException
+from jose import jwt
+from app.core.password_pool import PasswordPool
+from app.shared.jwt_claims import ClaimsCache, bearer_token, subject_id, decode_token as _decode_token
+
+logger = logging.getLogger(__name__)
 
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+def decode_token(token: str) -> Optional[dict]:
+    """Verified claims (cached in ClaimsCache) or None if the token is invalid."""
+    return _decode_token(token, SECRET_KEY, ALGORITHM)
+
+# bcrypt runs in PasswordPool's worker processes, never on the request thread
+async def verify_password(plain_password, hashed_password):
+    return (await PasswordPool.verify_password(plain_password, hashed_password))[0]
+
+async def verify_and_update_password(plain_password, hashed_password):
+    """Returns (is_valid, new_hash); new_hash is set when the cost factor has changed."""
+    return await PasswordPool.verify_password(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await PasswordPool.hash_password(password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -19,9 +33,19 @@ def create_access_token(data: dict):
     to_encode.update({"exp": expire, "sub": str(data.get("sub"))})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def extract_user_id(token: str):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload.get("sub")
-    except JWTError:
-        return None
\ No newline at end of file
+def extract_user_id(token: str) -> Optional[int]:
+    return subject_id(decode_token(token))
+
+def get_optional_user_id(authorization: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    Shared auth dependency: the token's numeric subject or None. FastAPI caches
+    dependency results per request, so every consumer in a request shares one verification.
+    """
+    token = bearer_token(authorization)
+    return extract_user_id(token) if token else None
+
+def get_current_user_id(user_id: Optional[int] = Depends(get_optional_user_id)) -> int:
+    # A validly signed token whose sub is not a user id is still unauthorized
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return user_id
@@ -1,7 +1,6 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from sqlalchemy.pool import NullPool
 import urllib.parse
@@ -13,15 +12,15 @@ password = urllib.parse.quote_plus(os.getenv('PASSWORD')) # Encodes special char
 host = os.getenv('DB_HOST')
 port = os.getenv('DB_PORT')
 db_name = os.getenv('DB_NAME')
+# TLS is required in production; DB_SSLMODE=disable only for local benchmark stacks
+db_sslmode = os.getenv('DB_SSLMODE', 'require')
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{user}:{password}@{host}:{port}/{db_name}?sslmode=require"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"sslmode": "require"},poolclass=NullPool)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# asyncpg driver: queries await on the event loop instead of blocking it
+SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{db_name}"
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, connect_args={"ssl": db_sslmode}, poolclass=NullPool)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,11 +1,10 @@
 from fastapi import FastAPI
 from app.api import user_router
-from app.database import engine, Base
+from app.core.password_pool import PasswordPool
+from app.core.http_client import close_http_client
+from app.core import cache
 from fastapi.middleware.cors import CORSMiddleware  # Import this
 
-# Create database tables (equivalent to spring.jpa.hibernate.ddl-auto=update)
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(title="User Microservice")
 
 app.add_middleware(
@@ -16,6 +15,18 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    PasswordPool.shutdown()
+
+@app.on_event("shutdown")
+async def shutdown_http_client():
+    await close_http_client()
+
+@app.on_event("shutdown")
+async def shutdown_redis():
+    await cache.close_redis()
+
 app.include_router(user_router.router)
 
 @app.get("/api/v1/user/health")
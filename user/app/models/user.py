@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
@@ -16,11 +16,16 @@ class User(Base):
     problem_solved_medium = Column(Integer, default=0)
     problem_solved_hard = Column(Integer, default=0)
     problem_solved_total = Column(Integer, default=0)
+    # Legacy: the weekly chat quota now lives in Redis; these seed a user's first bucket
     chat_count_week = Column(Integer, default=0)
     last_chat_reset = Column(DateTime, default=datetime.datetime.utcnow)
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Serves the per-conversation history query (cold starts and /chat/history)
+        Index("idx_chat_user_problem_ts", "user_id", "problem_id", "timestamp"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     content = Column(Text)
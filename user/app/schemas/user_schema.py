@@ -16,6 +16,8 @@ class ChatRequest(BaseModel):
     code: str
     userMessage: str
     problemId: str
+    # Stream tokens back as server-sent events instead of one JSON reply
+    stream: bool = False
 
 class UserResponse(BaseModel):
     id: int
@@ -24,4 +26,20 @@ class UserResponse(BaseModel):
     role: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserProfileDTO(BaseModel):
+    """Public profile projection: never carries the password hash."""
+    id: int
+    username: str
+    name: Optional[str] = None
+    email: str
+    role: str
+    daily_streak: int = 0
+    problem_solved_easy: int = 0
+    problem_solved_medium: int = 0
+    problem_solved_hard: int = 0
+    problem_solved_total: int = 0
+
+    class Config:
+        from_attributes = True
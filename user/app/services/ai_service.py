@@ -1,59 +1,45 @@
-import httpx
+import json
 import os
 import datetime
-from sqlalchemy.orm import Session
-from app.models.user import ChatMessage, User
+from typing import AsyncIterator, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.http_client import get_http_client
+from app.database import SessionLocal
+from app.models.user import ChatMessage
+from app.services.chat_history_service import ChatHistoryService
+from app.services.response_cache_service import ResponseCache
 
 class AiService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.api_key = os.getenv("OPEN_AI_KEY")
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        # Overridable so a local stub completion server can stand in
+        self.api_url = os.getenv("AI_API_URL", "https://api.openai.com/v1/chat/completions")
 
 
     async def get_chat_history(self, user_id: int, problem_id: str):
-        history = self.db.query(ChatMessage).filter(
-            ChatMessage.user_id == user_id,
-            ChatMessage.problem_id == problem_id
-        ).order_by(ChatMessage.timestamp.asc()).all()
+        history = (await self.db.execute(
+            select(ChatMessage.role, ChatMessage.content).where(
+                ChatMessage.user_id == user_id,
+                ChatMessage.problem_id == problem_id
+            ).order_by(ChatMessage.timestamp.asc())
+        )).all()
         
         return [{"role": msg.role, "content": msg.content} for msg in history]
 
-    async def get_ai_response(self, user: User, problem_statement: str, code: str, user_message: str, problem_id: str):
-        from app.services.rate_limiter_service import RateLimiterService
-        
-        max_chats = int(os.getenv("MAX_CHATS_PER_WEEK", 20))
-        seconds_in_week = 7 * 24 * 3600
-        
-        is_allowed, next_time, update_vals = RateLimiterService.check_rate_limit(
-            current_count=user.chat_count_week or 0,
-            last_reset=user.last_chat_reset,
-            max_requests=max_chats,
-            period_seconds=seconds_in_week
-        )
-        
-        if not is_allowed:
-            formatted_time = next_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-            return f"⚠️ Rate limit reached. Standard rate is {max_chats} chats/week. Next chat available at {formatted_time}."
-            
-        # Update user state if allowed
-        user.chat_count_week = update_vals[0]
-        user.last_chat_reset = update_vals[1]
-        # Commit will happen after successful response in save_message
-        self.db.commit()
-
+    def _build_payload(self, problem_statement: str, code: str, user_message: str, history: List[dict], stream: bool = False) -> dict:
         system_prompt = f"You are an expert coding assistant. Context:\nProblem: {problem_statement}\nUser's Current Code: {code}\nKeep answers concise."
-        
-        history = self.db.query(ChatMessage).filter(
-            ChatMessage.user_id == user.id,
-            ChatMessage.problem_id == problem_id
-        ).order_by(ChatMessage.timestamp.asc()).all()
 
+        # Bounded context: the recent window, trimmed to the token budget
         messages = [{"role": "system", "content": system_prompt}]
         
-        for msg in history:
-            role = "assistant" if msg.role == "assistant" else "user"
-            messages.append({"role": role, "content": msg.content})
+        for msg in ChatHistoryService.fit_to_budget(history):
+            if msg["role"] == "system":
+                messages.append(msg)
+                continue
+            role = "assistant" if msg["role"] == "assistant" else "user"
+            messages.append({"role": role, "content": msg["content"]})
 
         messages.append({"role": "user", "content": user_message})
         
@@ -61,26 +47,117 @@ class AiService:
             "model": os.getenv("AI_MODEL", "gpt-3.5-turbo"),
             "messages": messages
         }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    async def _history(self, user_id: int, problem_id: str):
+        """
+        The conversation's recent window, and whether the reply may go through
+        ResponseCache: only an opening question's reply is independent of
+        history the model would otherwise see.
+        """
+        history = await ChatHistoryService(self.db).get_window(user_id, problem_id)
+        return history, not history
+
+    async def get_ai_response(self, user_id: int, problem_statement: str, code: str, user_message: str, problem_id: str):
+        history, cacheable = await self._history(user_id, problem_id)
+        if cacheable:
+            cached_reply = await ResponseCache.lookup(problem_id, code, user_message)
+            if cached_reply is not None:
+                await self.save_messages(user_id, problem_id, [("user", user_message), ("assistant", cached_reply)])
+                return cached_reply
+
+        payload = self._build_payload(problem_statement, code, user_message, history)
         headers = {"Authorization": f"Bearer {self.api_key}"}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.api_url, json=payload, headers=headers)
+        client = get_http_client()
+        try:
+            response = await client.post(self.api_url, json=payload, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+            ai_reply = data["choices"][0]["message"]["content"]
+        except Exception as e:
+            return f"⚠️ AI Service Error: {str(e)}"
+
+        await self.save_messages(user_id, problem_id, [("user", user_message), ("assistant", ai_reply)])
+        if cacheable:
+            await ResponseCache.store(problem_id, code, user_message, ai_reply)
+        return ai_reply
+
+    async def stream_ai_response(self, user_id: int, problem_statement: str, code: str, user_message: str, problem_id: str) -> AsyncIterator[str]:
+        """
+        Returns a server-sent event stream: {"token": ...} per delta as the model
+        produces it, then [DONE]. Everything that needs the request's session runs
+        here, before streaming starts; both messages are persisted in one write
+        once the stream completes.
+        """
+        history, cacheable = await self._history(user_id, problem_id)
+        if cacheable:
+            cached_reply = await ResponseCache.lookup(problem_id, code, user_message)
+            if cached_reply is not None:
+                await self.save_messages(user_id, problem_id, [("user", user_message), ("assistant", cached_reply)])
+                return self._replay(cached_reply)
+
+        payload = self._build_payload(problem_statement, code, user_message, history, stream=True)
+        return self._stream(payload, user_id, code, user_message, problem_id, cacheable)
+
+    @staticmethod
+    async def _replay(reply: str) -> AsyncIterator[str]:
+        yield f"data: {json.dumps({'token': reply})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def _stream(self, payload: dict, user_id: int, code: str, user_message: str, problem_id: str, cacheable: bool) -> AsyncIterator[str]:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        client = get_http_client()
+        parts: List[str] = []
+        try:
+            async with client.stream("POST", self.api_url, json=payload, headers=headers) as response:
                 response.raise_for_status()
-                data = response.json()
-                ai_reply = data["choices"][0]["message"]["content"]
-            except Exception as e:
-                return f"⚠️ AI Service Error: {str(e)}"
-
-            self.save_message(user.id, user_message, "user", problem_id)
-            self.save_message(user.id, ai_reply, "assistant", problem_id)
-            
-            # user.chat_count_week updated at start of function
-            # self.db.commit() # Already committed in save_message
-            
-            return ai_reply
-
-    def save_message(self, user_id, content, role, problem_id):
-        msg = ChatMessage(user_id=user_id, content=content, role=role, problem_id=problem_id)
-        self.db.add(msg)
-        self.db.commit()
\ No newline at end of file
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    # Some chunks (usage, content filter) carry no choices
+                    chunk = json.loads(data)
+                    delta = ((chunk.get("choices") or [{}])[0].get("delta") or {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        yield f"data: {json.dumps({'token': delta})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': f'AI Service Error: {str(e)}'})}\n\n"
+            return
+
+        reply = "".join(parts)
+        await self._save_detached(user_id, problem_id, [("user", user_message), ("assistant", reply)])
+        # An empty reply (e.g. a filtered stream) must never be served to anyone else
+        if reply and cacheable:
+            await ResponseCache.store(problem_id, code, user_message, reply)
+        yield "data: [DONE]\n\n"
+
+    @staticmethod
+    async def _save_detached(user_id, problem_id, messages: List[tuple]):
+        # The request-scoped session may already be released once streaming starts
+        async with SessionLocal() as db:
+            await AiService(db).save_messages(user_id, problem_id, messages)
+
+    async def save_messages(self, user_id, problem_id, messages: List[tuple]):
+        """Persists (role, content) pairs in a single commit."""
+        # Explicit, strictly increasing timestamps keep history order stable within the batch
+        now = datetime.datetime.utcnow()
+        self.db.add_all([
+            ChatMessage(
+                user_id=user_id, content=content, role=role, problem_id=problem_id,
+                timestamp=now + datetime.timedelta(microseconds=i)
+            )
+            for i, (role, content) in enumerate(messages)
+        ])
+        await self.db.commit()
+        await ChatHistoryService(self.db).append(
+            user_id, problem_id, [{"role": role, "content": content} for role, content in messages]
+        )
+
+    async def save_message(self, user_id, content, role, problem_id):
+        await self.save_messages(user_id, problem_id, [(role, content)])
@@ -0,0 +1,81 @@
+import json
+import os
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import cache
+from app.models.user import ChatMessage
+
+CHAT_HISTORY_KEY = "chat:history:"
+HISTORY_WINDOW = int(os.getenv("AI_HISTORY_WINDOW", 20))           # messages kept hot
+HISTORY_TOKEN_BUDGET = int(os.getenv("AI_HISTORY_TOKEN_BUDGET", 2000))
+HISTORY_TTL_SECONDS = 86400
+TRUNCATION_NOTE = "(Earlier messages in this conversation were omitted.)"
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/code; close enough for budgeting
+    return len(text or "") // 4 + 1
+
+class ChatHistoryService:
+    """
+    Recent-turn window per (user, problem) conversation, kept as a capped Redis
+    list. Postgres is only read on a cold start, using the
+    (user_id, problem_id, timestamp) index.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _key(user_id, problem_id) -> str:
+        return f"{CHAT_HISTORY_KEY}{user_id}:{problem_id}"
+
+    async def get_window(self, user_id: int, problem_id: str) -> List[dict]:
+        key = self._key(user_id, problem_id)
+        cached = await cache.r.lrange(key, 0, -1)
+        if cached:
+            return [json.loads(m) for m in cached]
+
+        rows = (await self.db.execute(
+            select(ChatMessage.role, ChatMessage.content).where(
+                ChatMessage.user_id == user_id,
+                ChatMessage.problem_id == problem_id
+            ).order_by(ChatMessage.timestamp.desc()).limit(HISTORY_WINDOW)
+        )).all()
+        window = [{"role": r.role, "content": r.content} for r in reversed(rows)]
+
+        if window:
+            pipe = cache.r.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.rpush(key, *[json.dumps(m) for m in window])
+            pipe.expire(key, HISTORY_TTL_SECONDS)
+            await pipe.execute()
+        return window
+
+    async def append(self, user_id: int, problem_id: str, messages: List[dict]):
+        """
+        Extends a hot window. A cold one is left alone (RPUSHX): starting it
+        here would hold only these turns, and get_window would never reload the
+        rest from Postgres, where save_messages has already committed them.
+        """
+        key = self._key(user_id, problem_id)
+        pipe = cache.r.pipeline(transaction=False)
+        pipe.rpushx(key, *[json.dumps(m) for m in messages])
+        pipe.ltrim(key, -HISTORY_WINDOW, -1)
+        pipe.expire(key, HISTORY_TTL_SECONDS)
+        await pipe.execute()
+
+    @staticmethod
+    def fit_to_budget(window: List[dict], budget: int = HISTORY_TOKEN_BUDGET) -> List[dict]:
+        """Keeps the newest turns that fit in the token budget, noting any that were dropped."""
+        kept = []
+        used = 0
+        for msg in reversed(window):
+            cost = estimate_tokens(msg["content"])
+            if used + cost > budget:
+                break
+            kept.append(msg)
+            used += cost
+        kept.reverse()
+        if len(kept) < len(window):
+            kept.insert(0, {"role": "system", "content": TRUNCATION_NOTE})
+        return kept
@@ -1,54 +1,69 @@
-from datetime import datetime, timedelta
-from typing import Tuple, Optional
-import math
+import datetime
+import logging
+import os
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import cache
+from app.models.user import User
+from app.shared.rate_limit import TOKEN_BUCKET_LUA, RateLimiterUnavailable, TokenBucketLimiter, policy
+
+logger = logging.getLogger(__name__)
+
+MAX_CHATS_PER_WEEK = int(os.getenv("MAX_CHATS_PER_WEEK", 20))
+SECONDS_IN_WEEK = 7 * 24 * 3600
+CHAT_UNAVAILABLE_MESSAGE = "⚠️ Chat is temporarily unavailable. Please try again in a moment."
+
+# route -> (per-subject bucket, global bucket)
+POLICIES = {
+    "chat": (
+        policy("chat", MAX_CHATS_PER_WEEK, SECONDS_IN_WEEK),
+        policy("chat_global", 600, 60)
+    ),
+}
+
+# Chat fails closed: every allowed request is a paid model call
+limiter = TokenBucketLimiter(cache.register_script(TOKEN_BUCKET_LUA), POLICIES, fail_closed={"chat"})
 
 class RateLimiterService:
     @staticmethod
-    def check_rate_limit(
-        current_count: int, 
-        last_reset: Optional[datetime], 
-        max_requests: int, 
-        period_seconds: int
-    ) -> Tuple[bool, Optional[datetime], Optional[tuple]]:
+    async def _legacy_chat_tokens(db: AsyncSession, user_id: int) -> Optional[float]:
         """
-        Checks if the request is allowed based on Token Bucket algorithm.
-        
-        Args:
-            current_count: Current debt/tokens used.
-            last_reset: Last time usage was updated.
-            max_requests: Bucket capacity.
-            period_seconds: Period for the rate (e.g. 1 week in seconds).
+        Tokens left under the old chat_count_week/last_chat_reset debt model,
+        so users keep their quota when their Redis bucket is first created.
+        """
+        row = (await db.execute(
+            select(User.chat_count_week, User.last_chat_reset).where(User.id == user_id)
+        )).first()
+        if row is None or not row.chat_count_week:
+            return None
+        capacity, rate = POLICIES["chat"][0]
+        elapsed = (datetime.datetime.utcnow() - (row.last_chat_reset or datetime.datetime.utcnow())).total_seconds()
+        debt = max(0.0, row.chat_count_week - elapsed * rate)
+        return capacity - debt
 
-        Returns:
-            Tuple containing:
-            - is_allowed (bool)
-            - next_available_time (datetime | None): If blocked, when it will be allowed.
-            - update_values (tuple | None): (new_count, new_reset_time) to save to DB if allowed.
+    @staticmethod
+    async def check_chat_quota(db: AsyncSession, user_id: int) -> Optional[str]:
         """
-        now = datetime.utcnow()
-        
-        # Calculate refill rate (tokens per second)
-        refill_rate = max_requests / period_seconds
-        
-        # Calculate tokens to restore (debt to reduce)
-        last_reset_time = last_reset or now
-        time_passed = (now - last_reset_time).total_seconds()
-        debt_reduction = time_passed * refill_rate
-        
-        # Update current debt
-        current_debt = max(0.0, float(current_count) - debt_reduction)
-        
-        
-        # Case 1: Request Allowed
-        if current_debt + 1 <= max_requests:
-            new_count = math.ceil(current_debt + 1)
-            return True, None, (new_count, now)
-            
-        # Case 2: Request Blocked
-        # Calculate when debt drops enough to allow 1 request
-        # Target debt = max_requests - 1
-        debt_to_shed = current_debt - (max_requests - 1)
-        seconds_to_wait = debt_to_shed / refill_rate
-        next_available_time = now + timedelta(seconds=seconds_to_wait)
-        
-        return False, next_available_time, None
+        Takes one chat from the user's weekly quota. Returns None if allowed,
+        otherwise the reply to send instead (the same message the chat route
+        has always returned with a 200).
+        """
+        subject = f"user:{user_id}"
+        try:
+            initial = None
+            if not await cache.r.exists(limiter.bucket_key("chat", subject)):
+                initial = await RateLimiterService._legacy_chat_tokens(db, user_id)
+            retry_after = await limiter.consume_async("chat", subject, initial)
+        except RateLimiterUnavailable:
+            return CHAT_UNAVAILABLE_MESSAGE
+        except Exception as e:
+            # Redis failed before the script ran; chat still fails closed
+            logger.error(f"Chat quota check failed, refusing chat: {e}")
+            return CHAT_UNAVAILABLE_MESSAGE
+        if retry_after <= 0:
+            return None
+
+        next_time = datetime.datetime.utcnow() + datetime.timedelta(seconds=retry_after)
+        formatted_time = next_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+        return f"⚠️ Rate limit reached. Standard rate is {POLICIES['chat'][0][0]} chats/week. Next chat available at {formatted_time}."
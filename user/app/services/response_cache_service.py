@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional
+import numpy as np
+from app.core import cache
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_KEY = "ai:response:"
+SIMILARITY_THRESHOLD = float(os.getenv("AI_CACHE_SIMILARITY", 0.92))
+MAX_ENTRIES_PER_PROBLEM = int(os.getenv("AI_CACHE_MAX_ENTRIES", 500))
+MAX_INDEXES = int(os.getenv("AI_CACHE_MAX_INDEXES", 2000))
+CACHE_TTL_SECONDS = 7 * 86400
+
+# Questions about the user's own code depend on that code, so they are never shared
+CODE_SPECIFIC = re.compile(
+    r"```|\bmy (code|solution|approach|program|implementation)\b|\bthis (code|line|loop|function)\b"
+    r"|\bline \d+|\bwhy (does|is|doesn't|isn't) (it|my|this)\b|\b(error|exception|traceback|segfault)\b"
+    r"|\bwrong answer\b|\btle\b|\bdebug\b|[{};]",
+    re.IGNORECASE
+)
+
+def normalize_message(message: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", message.lower())
+    return " ".join(text.split())
+
+def is_code_specific(message: str) -> bool:
+    return bool(CODE_SPECIFIC.search(message))
+
+def code_fingerprint(code: Optional[str]) -> str:
+    """
+    Whitespace-insensitive digest of the user's code. The model sees the code,
+    so replies are only shared between identical code (typically the untouched
+    starter template or an empty editor).
+    """
+    normalized = " ".join((code or "").split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class HashingEmbedder:
+    """
+    Local, dependency-free embedding: hashed word unigrams and bigrams, L2-normalized.
+    Deterministic, so it doubles as the stub in tests.
+    """
+    def __init__(self, dims: int = 512):
+        self.dims = dims
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dims, dtype=np.float32)
+        words = normalize_message(text).split()
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dims
+            vec[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+class _ProblemIndex:
+    def __init__(self, dims: int):
+        self.vectors = np.zeros((0, dims), dtype=np.float32)
+        self.replies: List[str] = []
+        self.exact: dict = {}
+
+
+class ResponseCache:
+    """
+    Semantic cache of AI replies per (problem, code fingerprint), for opening
+    questions only: AiService skips it once a conversation has history, which
+    the model would see. Lookups try the normalized text first, then cosine
+    similarity over the stored embeddings. Entries are persisted to Redis so
+    new workers start warm; the in-memory indexes are an LRU bounded by
+    MAX_INDEXES.
+    """
+    _embedder = HashingEmbedder()
+    _indexes: "OrderedDict[str, _ProblemIndex]" = OrderedDict()
+    _lock = Lock()
+    _stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    @classmethod
+    def set_embedder(cls, embedder):
+        """Swaps the embedding model (anything with embed(text) -> 1-D unit vector)."""
+        with cls._lock:
+            cls._embedder = embedder
+            cls._indexes.clear()
+
+    @classmethod
+    def _count(cls, stat: str):
+        with cls._lock:
+            cls._stats[stat] += 1
+
+    @classmethod
+    def _add(cls, index: _ProblemIndex, question: str, reply: str):
+        vector = cls._embedder.embed(question)
+        if len(index.replies) >= MAX_ENTRIES_PER_PROBLEM:
+            # Drop the oldest entry
+            index.vectors = index.vectors[1:]
+            index.replies.pop(0)
+            index.exact = {k: v - 1 for k, v in index.exact.items() if v > 0}
+        index.vectors = np.vstack([index.vectors, vector[np.newaxis, :]])
+        index.replies.append(reply)
+        index.exact[normalize_message(question)] = len(index.replies) - 1
+
+    @classmethod
+    async def _get_index(cls, scope: str) -> _ProblemIndex:
+        with cls._lock:
+            index = cls._indexes.get(scope)
+            if index is not None:
+                cls._indexes.move_to_end(scope)
+                return index
+
+        # Loaded without holding the lock, which is never held across an await
+        entries = []
+        try:
+            raw_entries = await cache.r.lrange(f"{RESPONSE_CACHE_KEY}{scope}", -MAX_ENTRIES_PER_PROBLEM, -1)
+            entries = [json.loads(raw) for raw in raw_entries]
+        except Exception as e:
+            logger.error(f"Could not load response cache for {scope}: {e}")
+
+        with cls._lock:
+            index = cls._indexes.get(scope)
+            if index is None:
+                index = _ProblemIndex(len(cls._embedder.embed("")))
+                for entry in entries:
+                    cls._add(index, entry["question"], entry["reply"])
+                cls._indexes[scope] = index
+                while len(cls._indexes) > MAX_INDEXES:
+                    cls._indexes.popitem(last=False)
+            return index
+
+    @staticmethod
+    def _scope(problem_id: str, code: Optional[str]) -> str:
+        return f"{problem_id}:{code_fingerprint(code)}"
+
+    @classmethod
+    async def lookup(cls, problem_id: str, code: Optional[str], message: str) -> Optional[str]:
+        if is_code_specific(message):
+            cls._count("bypassed")
+            return None
+
+        index = await cls._get_index(cls._scope(problem_id, code))
+        with cls._lock:
+            position = index.exact.get(normalize_message(message))
+            if position is None and index.replies:
+                scores = index.vectors @ cls._embedder.embed(message)
+                best = int(np.argmax(scores))
+                if scores[best] >= SIMILARITY_THRESHOLD:
+                    position = best
+            reply = index.replies[position] if position is not None else None
+            cls._stats["hits" if reply is not None else "misses"] += 1
+        return reply
+
+    @classmethod
+    async def store(cls, problem_id: str, code: Optional[str], message: str, reply: str):
+        if is_code_specific(message) or not reply.strip():
+            return
+        scope = cls._scope(problem_id, code)
+        index = await cls._get_index(scope)
+        with cls._lock:
+            cls._add(index, message, reply)
+        key = f"{RESPONSE_CACHE_KEY}{scope}"
+        pipe = cache.r.pipeline(transaction=False)
+        pipe.rpush(key, json.dumps({"question": message, "reply": reply}))
+        pipe.ltrim(key, -MAX_ENTRIES_PER_PROBLEM, -1)
+        pipe.expire(key, CACHE_TTL_SECONDS)
+        await pipe.execute()
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["entries"] = sum(len(i.replies) for i in cls._indexes.values())
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
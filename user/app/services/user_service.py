@@ -1,22 +1,35 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.schemas.user_schema import RegisterDTO, LoginDTO
-from app.core import security
+from app.schemas.user_schema import RegisterDTO, LoginDTO, UserProfileDTO
+from app.core import security, cache
+from app.shared.local_cache import LocalCache
 from fastapi import HTTPException
+from typing import Optional
+
+# Written by the problem service's StatsService as verdicts land
+USER_STATS_KEY = "user:stats:"
+SOLVED_FIELDS = ("problem_solved_easy", "problem_solved_medium", "problem_solved_hard", "problem_solved_total")
+
+# Serialized UserProfileDTO. The problem service deletes the Redis copy on a new
+# solve; the short L1 TTL bounds how long other workers keep the old one.
+PROFILE_KEY_PREFIX = "user:profile:"
+PROFILE_TTL_SECONDS = 3600
+PROFILE_L1_TTL_SECONDS = 30
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def register_user(self, data: RegisterDTO):
+    async def register_user(self, data: RegisterDTO):
         # Check if email/username exists
-        if self.db.query(User).filter(User.email == data.email).first():
+        if (await self.db.execute(select(User.id).where(User.email == data.email))).first():
             raise HTTPException(status_code=400, detail="Email already in use")
         
-        if self.db.query(User).filter(User.username == data.username).first():
+        if (await self.db.execute(select(User.id).where(User.username == data.username))).first():
             raise HTTPException(status_code=400, detail="Username already taken")
 
-        hashed_password = security.get_password_hash(data.password)
+        hashed_password = await security.get_password_hash(data.password)
         
         new_user = User(
             username=data.username,
@@ -29,17 +42,77 @@ class UserService:
         )
         
         self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
+        await self.db.commit()
+        await self.db.refresh(new_user)
         return new_user
 
-    def login_user(self, data: LoginDTO):
-        user = self.db.query(User).filter(User.email == data.email).first()
-        if not user or not security.verify_password(data.password, user.password):
+    async def login_user(self, data: LoginDTO):
+        user = (await self.db.execute(select(User).where(User.email == data.email))).scalars().first()
+        if not user:
+            return None
+
+        is_valid, new_hash = await security.verify_and_update_password(data.password, user.password)
+        if not is_valid:
             return None
+
+        # Cost factor changed since this hash was made: upgrade it while we have the plaintext
+        if new_hash:
+            user.password = new_hash
+            await self.db.commit()
         
         # Generate JWT token using user ID as subject
         return security.create_access_token(data={"sub": str(user.id), "username": user.username})
 
-    def get_user_by_id(self, user_id: int):
-        return self.db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+    async def get_user_by_id(self, user_id: int):
+        return (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
+
+    async def sync_solved_counts(self, user: User) -> User:
+        """Copies the live solved counters from Redis onto the user row, committing only on change."""
+        stats = await cache.r.hgetall(f"{USER_STATS_KEY}{user.id}")
+        if not stats:
+            return user
+
+        changed = False
+        for field in SOLVED_FIELDS:
+            value = int(stats.get(field, 0))
+            if getattr(user, field) != value:
+                setattr(user, field, value)
+                changed = True
+
+        if changed:
+            await self.db.commit()
+            await self.db.refresh(user)
+            await self.invalidate_profile(user.id)
+        return user
+
+    async def get_profile_json(self, user_id: int) -> Optional[bytes]:
+        """Serialized public profile from L1, then Redis, then Postgres. None if no such user."""
+        key = f"{PROFILE_KEY_PREFIX}{user_id}"
+
+        # L1
+        local_profile = LocalCache.get(key)
+        if local_profile is not None:
+            return local_profile
+
+        # L2
+        cached_profile = await cache.get_cache(key)
+        if cached_profile:
+            data = cached_profile.encode("utf-8")
+            LocalCache.set(key, data, ttl=PROFILE_L1_TTL_SECONDS)
+            return data
+
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            return None
+        await self.sync_solved_counts(user)
+
+        data = UserProfileDTO.model_validate(user).model_dump_json().encode("utf-8")
+        await cache.set_cache(key, data.decode("utf-8"), expiry=PROFILE_TTL_SECONDS)
+        LocalCache.set(key, data, ttl=PROFILE_L1_TTL_SECONDS)
+        return data
+
+    @staticmethod
+    async def invalidate_profile(user_id: int):
+        key = f"{PROFILE_KEY_PREFIX}{user_id}"
+        LocalCache.delete(key)
+        await cache.delete_cache(key)
@@ -0,0 +1,72 @@
+# Vendored from shared/local_cache.py by shared/sync.py; edit it there, not here.
+import time
+from threading import Lock
+from typing import Any, Callable, Optional, Dict, Tuple
+
+class LocalCache:
+    """
+    A simple thread-safe in-memory cache with TTL (Time To Live).
+    Services hook their hit/miss metrics in through `observer`.
+    """
+    _storage: Dict[str, Tuple[Any, float]] = {}
+    _lock = Lock()
+    observer: Optional[Callable[[bool], None]] = None
+    
+    # Optional: Max size to prevent memory leaks if many unique keys are generated
+    MAX_SIZE = 1000 
+
+    @classmethod
+    def get(cls, key: str) -> Optional[Any]:
+        with cls._lock:
+            if key in cls._storage:
+                data, expiry = cls._storage[key]
+                if time.time() < expiry:
+                    cls._observe(True)
+                    return data
+                else:
+                    # Lazy expiration
+                    del cls._storage[key]
+        cls._observe(False)
+        return None
+
+    @classmethod
+    def _observe(cls, hit: bool):
+        if cls.observer is not None:
+            cls.observer(hit)
+
+    @classmethod
+    def set(cls, key: str, value: Any, ttl: Optional[float] = 60):
+        with cls._lock:
+             # Basic eviction if full (remove oldest) - simplistic approach
+            if len(cls._storage) >= cls.MAX_SIZE:
+                # Remove expired keys first
+                now = time.time()
+                keys_to_remove = [k for k, v in cls._storage.items() if v[1] != float('inf') and v[1] < now]
+                for k in keys_to_remove:
+                    del cls._storage[k]
+                
+                # If still full, remove arbitrary (first in iteration)
+                if len(cls._storage) >= cls.MAX_SIZE:
+                    first_key = next(iter(cls._storage))
+                    del cls._storage[first_key]
+
+            expiry = float('inf') if ttl is None else time.time() + ttl
+            cls._storage[key] = (value, expiry)
+
+    @classmethod
+    def delete(cls, key: str):
+        with cls._lock:
+            if key in cls._storage:
+                del cls._storage[key]
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._storage.clear()
+            
+    @classmethod
+    def invalidate_prefix(cls, prefix: str):
+        with cls._lock:
+            keys_to_remove = [k for k in cls._storage if k.startswith(prefix)]
+            for k in keys_to_remove:
+                del cls._storage[k]
@@ -2,5 +2,8 @@
 
 IMAGE="acecoder121/codear-microservices:user"
 
+# app/shared/ is vendored from ../shared; refuse to build a drifted copy
+python ../shared/sync.py --check || exit 1
+
 docker build -t $IMAGE .
 docker push $IMAGE